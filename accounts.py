@@ -0,0 +1,6 @@
+def private_key_to_address(private_key: str) -> str:
+    """Derive the checksum wallet address for a hex private key
+    Uses eth_keys directly, which imports far faster than eth_account/web3.
+    """
+    from eth_keys import keys
+    return keys.PrivateKey(bytes.fromhex(private_key.replace('0x', ''))).public_key.to_checksum_address()
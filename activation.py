@@ -0,0 +1,176 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from rpc import RpcClient, DEFAULT_BATCH_SIZE
+from signing import sign_activations
+from nonce_manager import NonceManager, is_nonce_error
+from timeouts import Timeouts, DEFAULT_TIMEOUTS
+
+DEFAULT_POLL_INTERVAL = 2
+DEFAULT_API_WORKERS = 20
+
+def _chained(message: str, cause: Exception) -> Exception:
+    """An Exception for a per-wallet result that keeps cause reachable for resilience.find_error"""
+    error = Exception(message)
+    error.__cause__ = cause
+    return error
+
+class BulkActivator:
+    """Activate mining for many wallets with overlapping block-time waits
+
+    Fetches pending nonces per proxy in one batch (NonceManager), then
+    signs and broadcasts every wallet's activation transaction up front,
+    then polls all receipts together with batched eth_getTransactionReceipt
+    calls. Each wallet's /assignment/startMining fires in a worker thread
+    as soon as its receipt lands. RPC traffic goes through each wallet's
+    own proxy, batched per proxy.
+    """
+
+    def __init__(self, poll_interval: float = DEFAULT_POLL_INTERVAL, timeouts: Timeouts = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, api_workers: int = DEFAULT_API_WORKERS):
+        """Initialize with receipt polling, timeouts, batching and API concurrency settings
+        timeouts bounds each RPC request and the wait for all receipts.
+        """
+        self.poll_interval = poll_interval
+        self.timeouts = timeouts or DEFAULT_TIMEOUTS
+        self.batch_size = batch_size
+        self.api_workers = api_workers
+
+    def _group_by_proxy(self, bots: list) -> list:
+        """Return [(RpcClient, [bots])] with one client per proxy"""
+        groups = {}
+        for bot in bots:
+            proxy_key = bot.proxy_settings['http'] if bot.proxy_settings else None
+            if proxy_key not in groups:
+                groups[proxy_key] = (RpcClient(bot.rpc_url, bot.proxy_settings, timeouts=self.timeouts), [])
+            groups[proxy_key][1].append(bot)
+        return list(groups.values())
+
+    def submit_all(self, bots: list) -> dict:
+        """Sign and broadcast every bot's activation transaction
+        Returns {wallet address: tx hash hex or Exception}.
+        """
+        tx_hashes = {}
+        for client, group in self._group_by_proxy(bots):
+            try:
+                self._submit_group(client, group, tx_hashes)
+            except Exception as e:
+                # Fail this group only; other groups' transactions are already on their way
+                for bot in group:
+                    tx_hashes.setdefault(bot.wallet_address, _chained(f"Failed to send transaction: {str(e)}", e))
+        return tx_hashes
+
+    def _submit_group(self, client: RpcClient, group: list, tx_hashes: dict):
+        """Fetch nonces, then sign and send transactions for one proxy group"""
+        nonces = NonceManager(client, self.batch_size)
+        errors = nonces.prefetch([bot.wallet_address for bot in group])
+        for address, error in errors.items():
+            tx_hashes[address] = _chained(f"Failed to get nonce: {str(error)}", error)
+        to_send = [bot for bot in group if bot.wallet_address not in errors]
+
+        # Resend once with resynced nonces for wallets the node rejected
+        for attempt in range(2):
+            retry = self._send_group(client, nonces, to_send, tx_hashes)
+            if not retry or attempt == 1:
+                break
+            nonces.resync([bot.wallet_address for bot in retry])
+            to_send = retry
+
+    def _send_group(self, client: RpcClient, nonces: NonceManager, group: list, tx_hashes: dict) -> list:
+        """Sign and batch-send transactions for one proxy group
+        Records results in tx_hashes and returns the bots that failed
+        with a nonce error.
+        """
+        ready, to_sign = [], []
+        for bot in group:
+            try:
+                nonce = nonces.next_nonce(bot.wallet_address)
+            except Exception as e:
+                tx_hashes[bot.wallet_address] = e
+                continue
+            ready.append(bot)
+            to_sign.append((bot.private_key, nonce, bot.mining_contract))
+
+        # Sign the whole group up front (in a process pool for large groups)
+        send_calls = [
+            ("eth_sendRawTransaction", ["0x" + raw_transaction.hex()])
+            for raw_transaction in sign_activations(to_sign)
+        ]
+
+        retry = []
+        try:
+            # Never resend a batch of transactions blindly; nonce errors are handled below
+            sent = client.batch(send_calls, self.batch_size, idempotent=False)
+        except Exception as e:
+            # Proxy or node unreachable (or its circuit is open); fail this group only
+            sent = [_chained(f"Failed to send transaction: {str(e)}", e)] * len(ready)
+        for bot, tx_hash in zip(ready, sent):
+            tx_hashes[bot.wallet_address] = tx_hash
+            if isinstance(tx_hash, Exception):
+                if is_nonce_error(tx_hash):
+                    retry.append(bot)
+            else:
+                print(f"Transaction sent: {tx_hash}")
+        return retry
+
+    def _start(self, bot, on_activated):
+        """Start mining on the API for a confirmed wallet"""
+        bot.start_mining()
+        if on_activated:
+            on_activated(bot)
+        return True
+
+    def activate(self, bots: list, on_activated=None) -> dict:
+        """Activate mining for every bot
+        on_activated(bot) runs in a worker thread after a wallet's
+        startMining succeeds. Returns {wallet address: True or Exception}.
+        """
+        results = {}
+        pending = {}
+        tx_hashes = self.submit_all(bots)
+        for bot in bots:
+            tx_hash = tx_hashes[bot.wallet_address]
+            if isinstance(tx_hash, Exception):
+                results[bot.wallet_address] = _chained(f"Failed to activate mining: {str(tx_hash)}", tx_hash)
+            else:
+                pending[bot.wallet_address] = (bot, tx_hash)
+
+        futures = {}
+        receipt_timeout = self.timeouts.for_receipt()
+        deadline = time.monotonic() + receipt_timeout
+        with ThreadPoolExecutor(max_workers=self.api_workers) as pool:
+            while pending:
+                for client, group in self._group_by_proxy([bot for bot, _ in pending.values()]):
+                    receipt_calls = [
+                        ("eth_getTransactionReceipt", [pending[bot.wallet_address][1]]) for bot in group
+                    ]
+                    try:
+                        receipts = client.batch(receipt_calls, self.batch_size)
+                    except Exception:
+                        # Transient proxy/RPC failure; poll this group again next round
+                        continue
+                    for bot, receipt in zip(group, receipts):
+                        if receipt is None or isinstance(receipt, Exception):
+                            continue
+                        del pending[bot.wallet_address]
+                        if int(receipt['status'], 16) != 1:
+                            results[bot.wallet_address] = Exception("Failed to activate mining: Transaction failed")
+                        else:
+                            futures[bot.wallet_address] = pool.submit(self._start, bot, on_activated)
+
+                if not pending:
+                    break
+                if time.monotonic() >= deadline:
+                    for address, (_, tx_hash) in pending.items():
+                        results[address] = Exception(
+                            f"Failed to activate mining: Transaction {tx_hash} not mined after {receipt_timeout:g}s"
+                        )
+                    break
+                time.sleep(self.poll_interval)
+
+            for address, future in futures.items():
+                try:
+                    results[address] = future.result()
+                except Exception as e:
+                    results[address] = _chained(f"Failed to activate mining: {str(e)}", e)
+
+        return results
@@ -0,0 +1,52 @@
+"""Startup benchmark
+
+Runs each scenario in a fresh interpreter so import costs are measured cold,
+and reports the median wall time over several runs.
+
+Usage: python bench_startup.py [runs]
+"""
+import os
+import sys
+import statistics
+import subprocess
+
+SCENARIOS = {
+    "import main (menu startup)": "import main",
+    "TakerBot() for a status sweep": (
+        "from taker_bot import TakerBot\n"
+        "TakerBot('11' * 32)"
+    ),
+    "AsyncTakerBot() for a status sweep": (
+        "from taker_bot import AsyncTakerBot\n"
+        "AsyncTakerBot('11' * 32)"
+    ),
+    "reference: import web3": "import web3",
+}
+
+TIMER = (
+    "import time\n"
+    "_start = time.perf_counter()\n"
+    "{code}\n"
+    "print(time.perf_counter() - _start)\n"
+)
+
+def measure(code: str, runs: int) -> float:
+    """Return the median seconds to run code in a fresh interpreter"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", TIMER.format(code=code)],
+            cwd=here, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"=== Startup Benchmark (median of {runs} runs) ===")
+    for name, code in SCENARIOS.items():
+        print(f"{name:<40} {measure(code, runs) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
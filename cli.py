@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import argparse
+import threading
+from decimal import Decimal
+from contextlib import redirect_stdout
+from wallet_storage import WalletStorage, validate_private_keys, SALT_FILE as WALLET_SALT_FILE
+from proxy_storage import ProxyStorage, format_proxy_url, SALT_FILE as PROXY_SALT_FILE
+from proxy_health import ProxyHealth, DEFAULT_PROBE_URL, DEFAULT_PROBE_CONCURRENCY
+from key_derivation import prefetch_keys
+from token_cache import TokenCache, SALT_FILE as TOKEN_SALT_FILE
+from status_index import StatusIndex, DEFAULT_MAX_AGE
+from fleet import DEFAULT_CONCURRENCY, DEFAULT_PER_PROXY
+from rpc import RpcClient
+from timeouts import DEFAULT_WALLET_DEADLINE
+from main import parse_wallet_selection, collect_account_status, start_multi_mining
+
+# Environment variable holding the storage password
+PASSWORD_ENV = "TAKER_PASSWORD"
+
+class JsonlWriter:
+    """Write one JSON object per line and flush it immediately
+
+    Counts records whose 'ok' field is false so the command can exit
+    non-zero when any wallet failed.
+    """
+
+    def __init__(self, stream):
+        """Initialize with the stream records are written to"""
+        self.stream = stream
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        """Write a record as a single JSON line"""
+        with self._lock:
+            if not record.get('ok', True):
+                self.failed += 1
+            self.stream.write(json.dumps(record, default=str) + "\n")
+            self.stream.flush()
+
+def read_password(password_fd: int = None) -> str:
+    """Read the storage password from a file descriptor or PASSWORD_ENV"""
+    if password_fd is not None:
+        with os.fdopen(password_fd, "r", closefd=False) as f:
+            password = f.readline().rstrip("\r\n")
+    else:
+        password = os.environ.get(PASSWORD_ENV)
+    if not password:
+        raise ValueError(f"No password given; set {PASSWORD_ENV} or pass --password-fd")
+    return password
+
+def select_wallets(wallet_storage: WalletStorage, selection: str = None) -> list:
+    """Return [(wallet name, address)] for a selection like "1-5,8", or all wallets"""
+    wallets = wallet_storage.list_wallets()
+    if not selection:
+        return wallets
+    return [wallets[number - 1] for number in parse_wallet_selection(selection, len(wallets))]
+
+def _status_record(result: dict) -> dict:
+    """Turn a collect_account_status result into a JSONL record"""
+    record = {'ok': 'error' not in result, **result}
+    record['from_index'] = 'last_checked' in result
+    return record
+
+def _mining_record(entry: dict) -> dict:
+    """Turn a start_multi_mining summary entry into a JSONL record"""
+    return {'ok': not entry['status'].startswith('Error'), **entry}
+
+def cmd_status(args, stores: dict, out: JsonlWriter):
+    """Check mining status and rewards, one record per wallet"""
+    wallets = select_wallets(stores['wallets'], args.wallets)
+    token_cache = stores['tokens']
+    with token_cache.batch():
+        collect_account_status(stores['wallets'], stores['proxies'], wallets, args.concurrency, args.per_proxy,
+                               token_cache, stores['index'], args.fast, args.max_age,
+                               on_result=lambda result: out.write(_status_record(result)),
+                               wallet_deadline=args.deadline, health=stores['health'],
+                               skip_unhealthy=args.skip_unhealthy)
+
+def cmd_mine(args, stores: dict, out: JsonlWriter):
+    """Start or renew mining, one record per wallet"""
+    wallets = select_wallets(stores['wallets'], args.wallets)
+    if not wallets:
+        return
+    start_multi_mining(stores['wallets'], stores['proxies'], wallets, token_cache=stores['tokens'],
+                       bulk_activation=args.bulk, status_index=stores['index'],
+                       on_result=lambda entry: out.write(_mining_record(entry)), wallet_deadline=args.deadline,
+                       health=stores['health'], skip_unhealthy=args.skip_unhealthy)
+
+def cmd_balances(args, stores: dict, out: JsonlWriter):
+    """Fetch native balances with batched RPC calls, one record per wallet"""
+    groups = {}
+    for wallet_name, address in select_wallets(stores['wallets'], args.wallets):
+        proxy_settings = stores['proxies'].get_proxy(address)
+        proxy_key = proxy_settings['http'] if proxy_settings else None
+        groups.setdefault(proxy_key, (proxy_settings, []))[1].append((wallet_name, address))
+
+    for proxy_settings, wallets in groups.values():
+        proxy = format_proxy_url(proxy_settings) if proxy_settings else "No proxy"
+        try:
+            balances = RpcClient(proxy_settings=proxy_settings).get_balances([address for _, address in wallets])
+            error = None
+        except Exception as e:
+            balances, error = {}, f"Failed to get balance: {str(e)}"
+        for wallet_name, address in wallets:
+            wei = balances.get(address)
+            record = {'ok': wei is not None, 'wallet': wallet_name, 'address': address, 'proxy': proxy}
+            if wei is None:
+                record['error'] = error or "Failed to get balance"
+            else:
+                record['balance_wei'] = wei
+                record['balance'] = str(Decimal(wei) / Decimal(10 ** 18))
+            out.write(record)
+
+def cmd_proxies(args, stores: dict, out: JsonlWriter):
+    """Probe every stored proxy, one record per unique proxy"""
+    proxies = [data for _, data in stores['proxies'].list_proxies()]
+    stores['health'].check(proxies, args.target, args.concurrency)
+    stats = stores['proxies'].get_proxy_stats(stores['health'])
+    for proxy, row in stats['proxy_health'].items():
+        out.write({'ok': row['healthy'], 'wallets': stats['proxy_usage'][proxy], **row})
+
+def cmd_import(args, stores: dict, out: JsonlWriter):
+    """Import private keys (comma, space or newline separated), one record per key"""
+    if args.file == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.file, "r") as f:
+            text = f.read()
+    keys = [key for key in text.replace(",", " ").split() if key]
+
+    validated = validate_private_keys(keys)
+    with stores['wallets'].transaction() as batch:
+        for key, (clean_key, address, error) in zip(keys, validated):
+            record = {'ok': False, 'key': f"...{key[-8:]}"}
+            try:
+                if error:
+                    raise ValueError(error)
+                record['wallet'] = batch.add_validated(clean_key, address)
+                record['address'] = address
+                record['ok'] = True
+            except Exception as e:
+                record['error'] = str(e)
+            out.write(record)
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for all commands"""
+    parser = argparse.ArgumentParser(
+        description="Run Taker fleet operations without the interactive menu. "
+                    "Each wallet's result is written to stdout as one JSON line as soon as it finishes; "
+                    "progress goes to stderr."
+    )
+    parser.add_argument("--password-fd", type=int, help=f"read the storage password from this file descriptor "
+                                                          f"(default: ${PASSWORD_ENV})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    status = commands.add_parser("status", help="check mining status and rewards")
+    status.add_argument("--wallets", help="wallet numbers, e.g. 1-5,8 (default: all)")
+    status.add_argument("--fast", action="store_true", help="answer fresh wallets from the status index")
+    status.add_argument("--max-age", type=int, default=DEFAULT_MAX_AGE, help="seconds before an index row is stale")
+    status.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    status.add_argument("--per-proxy", type=int, default=DEFAULT_PER_PROXY)
+    status.add_argument("--deadline", type=float, default=DEFAULT_WALLET_DEADLINE,
+                        help="seconds before a wallet's check is cancelled")
+    status.add_argument("--skip-unhealthy", action="store_true",
+                        help="report wallets whose proxy failed its health checks without checking them")
+    status.set_defaults(func=cmd_status)
+
+    mine = commands.add_parser("mine", help="start or renew mining")
+    mine.add_argument("--wallets", help="wallet numbers, e.g. 1-5,8 (default: all)")
+    mine.add_argument("--bulk", action="store_true", help="submit all activation transactions first")
+    mine.add_argument("--deadline", type=float, default=DEFAULT_WALLET_DEADLINE,
+                      help="seconds before a wallet's login, status check and activation are cancelled")
+    mine.add_argument("--skip-unhealthy", action="store_true",
+                      help="report wallets whose proxy failed its health checks without trying them")
+    mine.set_defaults(func=cmd_mine)
+
+    balances = commands.add_parser("balances", help="show native token balances")
+    balances.add_argument("--wallets", help="wallet numbers, e.g. 1-5,8 (default: all)")
+    balances.set_defaults(func=cmd_balances)
+
+    proxies = commands.add_parser("proxies", help="probe proxy latency and record their health")
+    proxies.add_argument("--target", default=DEFAULT_PROBE_URL, help="URL requested through each proxy")
+    proxies.add_argument("--concurrency", type=int, default=DEFAULT_PROBE_CONCURRENCY)
+    proxies.set_defaults(func=cmd_proxies)
+
+    imports = commands.add_parser("import", help="import private keys")
+    imports.add_argument("file", help="file with private keys, or - for stdin")
+    imports.set_defaults(func=cmd_import)
+    return parser
+
+def main(argv: list = None) -> int:
+    """Run one command; returns 0 if every wallet succeeded, 1 otherwise"""
+    args = build_parser().parse_args(argv)
+    out = JsonlWriter(sys.stdout)
+    # Keep stdout for JSONL records; the shared code prints progress
+    with redirect_stdout(sys.stderr):
+        try:
+            password = read_password(args.password_fd)
+            prefetch_keys(password, [WALLET_SALT_FILE, PROXY_SALT_FILE, TOKEN_SALT_FILE])
+            stores = {
+                'wallets': WalletStorage(password),
+                'proxies': ProxyStorage(password),
+                'tokens': TokenCache(password),
+                'index': StatusIndex(),
+                'health': ProxyHealth(),
+            }
+            args.func(args, stores, out)
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return 2
+    return 1 if out.failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
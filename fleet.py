@@ -0,0 +1,106 @@
+import asyncio
+from collections import defaultdict
+from timeouts import DeadlineExceeded
+
+DEFAULT_CONCURRENCY = 20
+DEFAULT_PER_PROXY = 4
+
+class FleetRunner:
+    """Run one coroutine per wallet with bounded concurrency
+
+    Concurrency is capped both overall and per proxy, so a fleet sharing a
+    handful of proxies never opens more than `per_proxy` sessions through
+    any one of them. Wallets without a proxy share the direct connection
+    and count as a single group.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, per_proxy: int = DEFAULT_PER_PROXY):
+        """Initialize runner with overall and per-proxy worker limits"""
+        if concurrency < 1 or per_proxy < 1:
+            raise ValueError("Concurrency limits must be at least 1")
+        self.concurrency = concurrency
+        self.per_proxy = per_proxy
+
+    async def run(self, jobs: list, worker, on_result=None) -> list:
+        """Run worker(*args) for each (proxy_key, args) job
+        Returns the results in the same order as jobs, regardless of
+        the order in which they finish. on_result(result), if given, is
+        called with each result as soon as its job finishes.
+        """
+        overall = asyncio.Semaphore(self.concurrency)
+        proxy_limits = defaultdict(lambda: asyncio.Semaphore(self.per_proxy))
+
+        async def run_job(proxy_key, args):
+            # Take the proxy slot first so a busy proxy doesn't hold overall slots
+            async with proxy_limits[proxy_key]:
+                async with overall:
+                    result = await worker(*args)
+            if on_result:
+                on_result(result)
+            return result
+
+        return await asyncio.gather(*(run_job(proxy_key, args) for proxy_key, args in jobs))
+
+class Stage:
+    """One step of a StagePipeline with its own concurrency cap"""
+
+    def __init__(self, name: str, func, concurrency: int = DEFAULT_CONCURRENCY):
+        """func is a coroutine function taking the item's context dict"""
+        if concurrency < 1:
+            raise ValueError("Stage concurrency must be at least 1")
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+
+class StagePipeline:
+    """Move items through a sequence of stages independently
+
+    Every item carries a context dict from stage to stage. An item enters
+    the next stage as soon as it leaves the previous one, so a batch is
+    bounded by its slowest stage rather than by the sum of all items.
+    A stage ends an item early by setting ctx['done'] = True; an exception
+    ends it with ctx['error'] and ctx['failed_stage'] set. Once a stage
+    puts a Deadline in ctx['deadline'], later stages are cancelled when
+    it runs out, without holding up the other items.
+    """
+
+    def __init__(self, stages: list):
+        """Initialize pipeline from an ordered list of Stage objects"""
+        self.stages = stages
+
+    async def run(self, contexts: list, on_result=None) -> list:
+        """Run every context through the stages and return them in input order
+        on_result(ctx), if given, is called as soon as each item leaves the pipeline.
+        """
+        limits = {stage.name: asyncio.Semaphore(stage.concurrency) for stage in self.stages}
+
+        async def run_item(ctx):
+            for stage in self.stages:
+                if ctx.get('done'):
+                    break
+                try:
+                    async with limits[stage.name]:
+                        await self._run_stage(stage, ctx)
+                except Exception as e:
+                    ctx['error'] = e
+                    ctx['failed_stage'] = stage.name
+                    break
+            if on_result:
+                on_result(ctx)
+            return ctx
+
+        return await asyncio.gather(*(run_item(ctx) for ctx in contexts))
+
+    @staticmethod
+    async def _run_stage(stage: Stage, ctx: dict):
+        """Run one stage, cancelling it if the item's deadline runs out"""
+        deadline = ctx.get('deadline')
+        if deadline is None:
+            return await stage.func(ctx)
+        deadline.check(stage.name)
+        try:
+            return await asyncio.wait_for(stage.func(ctx), deadline.remaining())
+        except asyncio.TimeoutError:
+            if deadline.expired:
+                raise DeadlineExceeded(f"Deadline of {deadline.seconds:g}s exceeded during {stage.name}")
+            raise
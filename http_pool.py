@@ -0,0 +1,65 @@
+import threading
+import urllib.parse
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 20
+
+class SessionPool:
+    """Process-wide keep-alive requests sessions keyed by (proxy URL, host)
+
+    Bots that talk to the same host through the same proxy share one
+    session, so they reuse warm TCP/TLS connections instead of paying a
+    handshake per request. Sessions carry no per-bot state; pass headers
+    such as Authorization with each request.
+    """
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE):
+        """Initialize an empty pool with urllib3 pool sizes for new sessions"""
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def configure(self, pool_connections: int = None, pool_maxsize: int = None):
+        """Change pool sizes; applies to sessions created afterwards"""
+        if pool_connections:
+            self.pool_connections = pool_connections
+        if pool_maxsize:
+            self.pool_maxsize = pool_maxsize
+
+    def get_session(self, url: str, proxy_settings: dict = None) -> requests.Session:
+        """Return the shared session for url's host through proxy_settings"""
+        host = urllib.parse.urlsplit(url).netloc
+        proxy_url = (proxy_settings.get('https') or proxy_settings.get('http')) if proxy_settings else None
+        key = (proxy_url, host)
+        session = self._sessions.get(key)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                if proxy_settings:
+                    session.proxies = dict(proxy_settings)
+                self._sessions[key] = session
+            return session
+
+    def close_all(self):
+        """Close and forget every pooled session"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+# Shared by every bot and RPC client in the process
+default_pool = SessionPool()
+
+def get_session(url: str, proxy_settings: dict = None) -> requests.Session:
+    """Return a pooled keep-alive session from the process-wide pool"""
+    return default_pool.get_session(url, proxy_settings)
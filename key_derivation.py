@@ -0,0 +1,148 @@
+import os
+import json
+import base64
+import hashlib
+import threading
+from concurrent.futures import Future
+from cryptography.fernet import Fernet
+
+PBKDF2_ITERATIONS = 480000
+
+_salt_lock = threading.Lock()
+
+def read_or_create_salt(salt_file: str) -> bytes:
+    """Read the salt from salt_file, creating a random one if it doesn't exist"""
+    with _salt_lock:
+        if os.path.exists(salt_file):
+            with open(salt_file, "rb") as f:
+                return f.read()
+        salt = os.urandom(16)
+        with open(salt_file, "wb") as f:
+            f.write(salt)
+        return salt
+
+class KeyDerivation:
+    """Derive storage keys with PBKDF2 once per (password, salt) and cache them
+
+    Derivation can be started in background threads as soon as the password
+    is known. hashlib's PBKDF2 releases the GIL, so keys for several salt
+    files are derived in parallel.
+    """
+
+    def __init__(self, iterations: int = PBKDF2_ITERATIONS):
+        """Initialize an empty key cache"""
+        self.iterations = iterations
+        self._keys = {}  # (password digest, salt) -> Future of urlsafe-b64 key
+        self._lock = threading.Lock()
+
+    def _cache_key(self, password: str, salt: bytes) -> tuple:
+        # Index by a digest so the cache doesn't hold the password itself
+        return hashlib.sha256(password.encode()).digest(), salt
+
+    def _derive(self, password: str, salt: bytes) -> bytes:
+        key = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, self.iterations, dklen=32)
+        return base64.urlsafe_b64encode(key)
+
+    def _submit(self, password: str, salt: bytes, background: bool) -> Future:
+        """Return the future for this key, starting derivation if needed"""
+        cache_key = self._cache_key(password, salt)
+        with self._lock:
+            future = self._keys.get(cache_key)
+            if future is not None:
+                return future
+            future = Future()
+            self._keys[cache_key] = future
+
+        def run():
+            try:
+                future.set_result(self._derive(password, salt))
+            except Exception as e:
+                future.set_exception(e)
+
+        if background:
+            threading.Thread(target=run, name="key-derivation", daemon=True).start()
+        else:
+            run()
+        return future
+
+    def prefetch(self, password: str, salt_files: list):
+        """Start deriving the keys for salt_files in background threads"""
+        for salt_file in salt_files:
+            self._submit(password, read_or_create_salt(salt_file), background=True)
+
+    def get_key(self, password: str, salt_file: str) -> bytes:
+        """Return the urlsafe-b64 key for salt_file, waiting for a prefetch if one is running"""
+        salt = read_or_create_salt(salt_file)
+        return self._submit(password, salt, background=False).result()
+
+    def get_fernet(self, password: str, salt_file: str) -> Fernet:
+        """Return a Fernet instance keyed for salt_file"""
+        return Fernet(self.get_key(password, salt_file))
+
+    def clear(self):
+        """Forget all derived keys"""
+        with self._lock:
+            self._keys.clear()
+
+# Process-wide cache shared by all encrypted stores
+default_key_derivation = KeyDerivation()
+
+def prefetch_keys(password: str, salt_files: list):
+    """Start deriving keys for salt_files in the background"""
+    default_key_derivation.prefetch(password, salt_files)
+
+def get_fernet(password: str, salt_file: str) -> Fernet:
+    """Return a Fernet instance for salt_file from the process-wide cache"""
+    return default_key_derivation.get_fernet(password, salt_file)
+
+class EncryptedJsonFile:
+    """A Fernet-encrypted JSON file with a decrypted in-memory copy
+
+    The file is decrypted again only when its (mtime, size) changes, and
+    save() writes through the copy, so reads after a save cost nothing.
+    """
+
+    def __init__(self, path: str, fernet: Fernet):
+        """Initialize for the file at path; nothing is read until load()"""
+        self.path = path
+        self.fernet = fernet
+        # Last loaded or saved data, and the (mtime, size) it matches
+        self.data = None
+        self._stamp = None
+
+    def _file_stamp(self):
+        """Return (mtime, size) of the file, or None if it doesn't exist"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> dict:
+        """Return the decrypted data, decrypting the file only when it changed
+        The same dict is returned until the file changes; an unreadable
+        file loads as empty.
+        """
+        stamp = self._file_stamp()
+        if stamp is None:
+            if self.data is None or self._stamp is not None:
+                self.data, self._stamp = {}, None
+            return self.data
+        if self.data is not None and stamp == self._stamp:
+            return self.data
+
+        with open(self.path, "rb") as f:
+            encrypted_data = f.read()
+        try:
+            data = json.loads(self.fernet.decrypt(encrypted_data))
+        except Exception:
+            data = {}
+        self.data, self._stamp = data, stamp
+        return data
+
+    def save(self, data: dict):
+        """Encrypt and write data, keeping it as the in-memory copy"""
+        encrypted_data = self.fernet.encrypt(json.dumps(data).encode())
+        with open(self.path, "wb") as f:
+            f.write(encrypted_data)
+        self.data, self._stamp = data, self._file_stamp()
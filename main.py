@@ -1,11 +1,32 @@
 import os
 import sys
+import asyncio
+from typing import TYPE_CHECKING
 from getpass import getpass
-from wallet_storage import WalletStorage
-from proxy_storage import ProxyStorage, format_proxy_url
-from taker_bot import TakerBot
+from wallet_storage import WalletStorage, SALT_FILE as WALLET_SALT_FILE
+from proxy_storage import ProxyStorage, format_proxy_url, SALT_FILE as PROXY_SALT_FILE
+from proxy_health import ProxyHealth
+from key_derivation import prefetch_keys
+from token_cache import TokenCache, SALT_FILE as TOKEN_SALT_FILE
+from taker_bot import TakerBot, AsyncTakerBot, NOT_READ
+from mining_state import read_mining_states
+from activation import BulkActivator
+from signing import Signer
+from status_index import StatusIndex, is_stale, mining_expiry, DEFAULT_MAX_AGE
+from scheduler import MiningScheduler
+from resilience import default_breakers, is_proxy_failure, ProxyError, NO_RETRY
+from nonce_manager import NonceManager
+from rpc import RpcClient
+from timeouts import Timeouts, Deadline, DeadlineExceeded, DEFAULT_WALLET_DEADLINE
+from fleet import FleetRunner, Stage, StagePipeline, DEFAULT_CONCURRENCY, DEFAULT_PER_PROXY
 import time
 import random
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+# aiohttp is imported where a sweep starts, keeping menu startup fast
+if TYPE_CHECKING:
+    import aiohttp
 
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -72,14 +93,11 @@ def mining_menu(bot: TakerBot, wallet_name: str, wallet_address: str):
                 
             elif choice == "5":
                 try:
-                    is_mining = bot.check_mining_status()
-                    if is_mining:
+                    mining_status = bot.check_mining_status()
+                    if mining_status:
                         print("\nMining is currently ACTIVE")
-                        mining_time = bot.get_total_mining_time()
-                        last_time = mining_time['data']['lastMiningTime']
-                        total_time = mining_time['data']['totalMiningTime']
-                        current_time = int(time.time())
-                        time_left = (last_time + 24*60*60) - current_time
+                        total_time = mining_status.total_mining_time
+                        time_left = mining_status.time_left
                         
                         if time_left > 0:
                             hours = time_left // 3600
@@ -142,22 +160,58 @@ def add_proxy_menu(storage: ProxyStorage):
     except Exception as e:
         print(f"\nError adding proxies: {str(e)}")
 
-def proxy_management_menu(proxy_storage: ProxyStorage, wallet_storage: WalletStorage):
+def _format_health(row: dict) -> str:
+    """One-line summary of a proxy health row"""
+    if not row:
+        return "not checked"
+    if row['ttfb_ms'] is None:
+        latency = "no answer"
+    else:
+        latency = f"connect {row['connect_ms']:.0f}ms, first byte {row['ttfb_ms']:.0f}ms"
+    state = "OK" if row['healthy'] else "UNHEALTHY"
+    return f"{state}, {latency}, {row['error_rate']:.0%} errors"
+
+def check_proxy_health(proxy_storage: ProxyStorage, proxy_health: ProxyHealth):
+    """Probe every stored proxy and print the results, fastest first"""
+    proxies = [data for _, data in proxy_storage.list_proxies()]
+    if not proxies:
+        print("\nNo proxies found!")
+        return
+    
+    print(f"\nProbing {len(proxies)} proxy entries...")
+    proxy_health.check(proxies)
+    stats = proxy_storage.get_proxy_stats(proxy_health)
+    ranked = sorted(stats['proxy_health'].items(),
+                    key=lambda item: (not item[1]['healthy'], item[1]['ttfb_ms'] or float('inf')))
+    print("\nProxy Health:")
+    for proxy, row in ranked:
+        print(f"- {proxy}: {_format_health(row)}")
+        if row['last_error']:
+            print(f"  Last error: {row['last_error']}")
+    print(f"\nUnhealthy proxies: {stats['unhealthy_proxies']}")
+
+def proxy_management_menu(proxy_storage: ProxyStorage, wallet_storage: WalletStorage,
+                          proxy_health: ProxyHealth = None):
     """Submenu for proxy management"""
     while True:
         clear_screen()
         print("\n=== Proxy Management ===")
         
         # Show proxy statistics
-        stats = proxy_storage.get_proxy_stats()
+        stats = proxy_storage.get_proxy_stats(proxy_health)
         print(f"\nProxy Status:")
         print(f"Total unique proxies: {stats['total_proxies']}")
         print(f"Unassigned proxies: {stats['unassigned_proxies']}")
         print(f"Wallets with proxy: {stats['assigned_wallets']}")
+        if proxy_health:
+            print(f"Unhealthy proxies: {stats['unhealthy_proxies']}")
         if stats['proxy_usage']:
             print("\nProxy Usage:")
             for proxy, count in stats['proxy_usage'].items():
-                print(f"- {proxy}: {count} wallet(s)")
+                if proxy_health:
+                    print(f"- {proxy}: {count} wallet(s), {_format_health(stats['proxy_health'][proxy])}")
+                else:
+                    print(f"- {proxy}: {count} wallet(s)")
         
         print("\n1. Add Proxy(s)")
         print("2. Import Proxies from CSV")
@@ -165,9 +219,10 @@ def proxy_management_menu(proxy_storage: ProxyStorage, wallet_storage: WalletSto
         print("4. Auto-Assign Proxies to Wallets")
         print("5. List All Proxies")
         print("6. Remove Proxy")
-        print("7. Back to Main Menu")
+        print("7. Check Proxy Health")
+        print("8. Back to Main Menu")
         
-        choice = input("\nSelect option (1-7): ")
+        choice = input("\nSelect option (1-8): ")
         
         if choice == "1":
             add_proxy_menu(proxy_storage)
@@ -220,7 +275,7 @@ def proxy_management_menu(proxy_storage: ProxyStorage, wallet_storage: WalletSto
                 continue
                 
             # Get confirmation
-            print("\nThis will reassign all proxies to wallets in sequence.")
+            print("\nThis will reassign all proxies to wallets.")
             print("Current proxy assignments will be cleared.")
             print(f"Number of wallets: {len(wallets)}")
             print(f"Number of unique proxies: {stats['total_proxies']}")
@@ -231,6 +286,21 @@ def proxy_management_menu(proxy_storage: ProxyStorage, wallet_storage: WalletSto
                 input("\nPress Enter to continue...")
                 continue
                 
+            print("\nAssignment strategy:")
+            print("1. Round-robin (in sequence)")
+            print("2. Weighted by measured latency (run Check Proxy Health first)")
+            strategy = "weighted" if input("\nSelect strategy (1-2, default 1): ").strip() == "2" else "round_robin"
+            max_per_proxy = None
+            if strategy == "weighted":
+                limit = input("Max wallets per proxy (Enter for no limit): ").strip()
+                if limit:
+                    try:
+                        max_per_proxy = int(limit)
+                    except ValueError:
+                        print("\nInvalid number!")
+                        input("\nPress Enter to continue...")
+                        continue
+            
             confirm = input("\nProceed with auto-assignment? (y/n): ").lower()
             if confirm != 'y':
                 continue
@@ -239,7 +309,13 @@ def proxy_management_menu(proxy_storage: ProxyStorage, wallet_storage: WalletSto
             wallet_addresses = [addr for _, addr in wallets]
             
             # Perform auto-assignment
-            success, failed, errors = proxy_storage.auto_assign_proxies(wallet_addresses)
+            try:
+                success, failed, errors = proxy_storage.auto_assign_proxies(wallet_addresses, strategy, proxy_health,
+                                                                            max_per_proxy)
+            except ValueError as e:
+                print(f"\nError: {str(e)}")
+                input("\nPress Enter to continue...")
+                continue
             
             print(f"\nAuto-assignment completed:")
             print(f"Successfully assigned: {success}")
@@ -303,14 +379,257 @@ def proxy_management_menu(proxy_storage: ProxyStorage, wallet_storage: WalletSto
                 input("\nPress Enter to continue...")
                 
         elif choice == "7":
+            if not proxy_health:
+                print("\nProxy health table is not available!")
+            else:
+                check_proxy_health(proxy_storage, proxy_health)
+            input("\nPress Enter to continue...")
+            
+        elif choice == "8":
             return
             
         else:
             print("\nInvalid option!")
             input("\nPress Enter to continue...")
 
-def start_multi_mining(wallet_storage: WalletStorage, proxy_storage: ProxyStorage, selected_wallets: list):
-    """Start mining for multiple wallets with random delays"""
+# Per-stage concurrency caps for start_multi_mining
+DEFAULT_STAGE_LIMITS = {
+    'connect': 20,
+    'sign': 20,
+    'login': 20,
+    'status': 20,
+    'sign_tx': 20,
+    'submit': 10,
+    'confirm': 100,
+    'start': 20,
+}
+
+def _mining_stages(wallet_storage: WalletStorage, session: "aiohttp.ClientSession", signer: Signer,
+                   stage_limits: dict, token_cache: TokenCache = None, bulk_activation: bool = False) -> list:
+    """Build the connect -> sign -> login -> status -> sign_tx -> submit -> confirm -> start pipeline
+    Signing stages hand their work to signer's process pool and pass
+    ready-to-send payloads on to the network stages. With bulk_activation
+    the pipeline stops after the status check and wallets that need
+    activation are left for BulkActivator. Each wallet's deadline starts
+    when it enters the connect stage and covers every later stage.
+    """
+    async def delay(ctx):
+        # Random delay before each wallet (1-20 seconds); delays overlap
+        print(f"\nProcessing {ctx['wallet']} ({ctx['address']})...")
+        print(f"Waiting {ctx['delay']} seconds before proceeding...")
+        await asyncio.sleep(ctx['delay'])
+        
+        # Fail fast if the wallet's proxy circuit opened in the meantime
+        breaker = default_breakers.for_proxy(ctx['proxy_settings'])
+        if breaker:
+            breaker.check()
+
+    async def connect(ctx):
+        ctx['deadline'] = Deadline(ctx['deadline_seconds'])
+        private_key, _ = wallet_storage.get_wallet(ctx['wallet'])
+        ctx['private_key'] = private_key
+        if not ctx['proxy_settings']:
+            print(f"{ctx['wallet']}: Warning: No proxy configured for this wallet!")
+        else:
+            print(f"{ctx['wallet']}: Using proxy: {ctx['proxy']}")
+        
+        print(f"Connecting wallet {ctx['wallet']}...")
+        bot = AsyncTakerBot(private_key, ctx['proxy_settings'], session=session, token_cache=token_cache,
+                            nonce_manager=ctx.get('nonce_manager'), deadline=ctx['deadline'])
+        ctx['bot'] = bot
+        if not bot.use_cached_token():
+            ctx['login_nonce'] = await bot.generate_nonce()
+
+    async def sign(ctx):
+        if 'login_nonce' in ctx:
+            ctx['login_signature'] = await signer.sign_message(ctx['private_key'], ctx['login_nonce'])
+
+    async def login(ctx):
+        bot = ctx['bot']
+        if 'login_nonce' in ctx:
+            await bot.complete_login(ctx['login_nonce'], ctx['login_signature'])
+        
+        # Get initial user info and rewards
+        initial_info = await bot.get_user_info()
+        ctx['initial_reward'] = float(initial_info['data']['totalReward'])
+        print(f"{ctx['wallet']}: Initial Total Reward: {ctx['initial_reward']} TAKER")
+
+    async def status(ctx):
+        bot = ctx['bot']
+        mining_status = await bot.check_mining_status()
+        ctx['last_mining_time'] = mining_status.last_mining_time
+        ctx['total_mining_time'] = mining_status.total_mining_time
+        if not mining_status:
+            return
+        
+        print(f"{ctx['wallet']}: Wallet is already mining, skipping activation...")
+        total_time = mining_status.total_mining_time
+        time_left = mining_status.time_left
+        
+        final_info = await bot.get_user_info()
+        ctx['final_reward'] = float(final_info['data']['totalReward'])
+        ctx['user_info'] = final_info['data']
+        ctx['status'] = 'Already Mining'
+        ctx['time_left'] = f"{time_left//3600}h {(time_left%3600)//60}m" if time_left > 0 else "Ready"
+        ctx['total_time'] = f"{total_time/3600:.1f}h"
+        ctx['done'] = True
+
+    async def sign_tx(ctx):
+        print(f"{ctx['wallet']}: Activating mining process...")
+        bot = ctx['bot']
+        ctx['tx_nonce'] = await bot.next_nonce()
+        ctx['raw_transaction'] = await signer.sign_activation(ctx['private_key'], ctx['tx_nonce'],
+                                                              bot.mining_contract)
+
+    async def submit(ctx):
+        ctx['tx_hash'] = await ctx['bot'].submit_mining_transaction(ctx['raw_transaction'], ctx['tx_nonce'])
+
+    async def confirm(ctx):
+        await ctx['bot'].wait_for_mining_receipt(ctx['tx_hash'])
+
+    async def start(ctx):
+        bot = ctx['bot']
+        await bot.start_mining()
+        
+        # Get updated user info after activation
+        await asyncio.sleep(2)  # Wait briefly for update
+        final_info = await bot.get_user_info()
+        mining_time = await bot.get_total_mining_time()
+        ctx['last_mining_time'] = mining_time['data']['lastMiningTime']
+        ctx['total_mining_time'] = mining_time['data']['totalMiningTime']
+        ctx['final_reward'] = float(final_info['data']['totalReward'])
+        ctx['user_info'] = final_info['data']
+        ctx['status'] = 'Mining Started'
+        ctx['time_left'] = '24h 0m'
+        ctx['total_time'] = '0h'
+
+    stages = [
+        Stage('delay', delay, stage_limits.get('delay', 10**6)),
+        Stage('connect', connect, stage_limits['connect']),
+        Stage('sign', sign, stage_limits['sign']),
+        Stage('login', login, stage_limits['login']),
+        Stage('status', status, stage_limits['status']),
+    ]
+    if bulk_activation:
+        return stages
+    return stages + [
+        Stage('sign_tx', sign_tx, stage_limits['sign_tx']),
+        Stage('submit', submit, stage_limits['submit']),
+        Stage('confirm', confirm, stage_limits['confirm']),
+        Stage('start', start, stage_limits['start']),
+    ]
+
+async def _run_mining_pipeline(wallet_storage: WalletStorage, contexts: list, stage_limits: dict,
+                               token_cache: TokenCache = None, bulk_activation: bool = False,
+                               on_result=None) -> list:
+    """Run the mining pipeline over a shared HTTP connection pool"""
+    import aiohttp
+    async with aiohttp.ClientSession() as session:
+        with Signer() as signer:
+            stages = _mining_stages(wallet_storage, session, signer, stage_limits, token_cache, bulk_activation)
+            try:
+                return await StagePipeline(stages).run(contexts, on_result)
+            finally:
+                # Bots behind SOCKS proxies own their sessions
+                await asyncio.gather(*(ctx['bot'].close() for ctx in contexts if 'bot' in ctx))
+
+def _bulk_activate(wallet_storage: WalletStorage, contexts: list, token_cache: TokenCache = None):
+    """Submit every activation transaction first, then confirm receipts together"""
+    by_address = {}
+    bots = []
+    for ctx in contexts:
+        private_key, _ = wallet_storage.get_wallet(ctx['wallet'])
+        bot = TakerBot(private_key, ctx['proxy_settings'], token_cache=token_cache)
+        # Reuse the token from the pipeline's login instead of logging in again
+        bot._set_token(ctx['bot'].token)
+        by_address[bot.wallet_address] = ctx
+        bots.append(bot)
+    
+    def on_activated(bot):
+        ctx = by_address[bot.wallet_address]
+        time.sleep(2)  # Wait briefly for update
+        final_info = bot.get_user_info()
+        mining_time = bot.get_total_mining_time()
+        ctx['last_mining_time'] = mining_time['data']['lastMiningTime']
+        ctx['total_mining_time'] = mining_time['data']['totalMiningTime']
+        ctx['final_reward'] = float(final_info['data']['totalReward'])
+        ctx['user_info'] = final_info['data']
+        ctx['status'] = 'Mining Started'
+        ctx['time_left'] = '24h 0m'
+        ctx['total_time'] = '0h'
+    
+    print(f"\nSubmitting {len(bots)} activation transactions...")
+    results = BulkActivator().activate(bots, on_activated)
+    for address, result in results.items():
+        if isinstance(result, Exception):
+            by_address[address]['error'] = result
+            by_address[address]['failed_stage'] = 'bulk'
+
+def _attach_nonce_managers(contexts: list):
+    """Attach a NonceManager per proxy to contexts
+    Nothing is fetched here; each wallet's nonce is fetched in the sign_tx
+    stage, under its deadline, and only for wallets that need activation.
+    """
+    managers = {}
+    for ctx in contexts:
+        proxy_key = ctx['proxy_settings']['http'] if ctx['proxy_settings'] else None
+        if proxy_key not in managers:
+            managers[proxy_key] = NonceManager(RpcClient(proxy_settings=ctx['proxy_settings']))
+        ctx['nonce_manager'] = managers[proxy_key]
+
+def _mining_result(ctx: dict) -> dict:
+    """Build the per-wallet summary entry for a finished mining pipeline context"""
+    if 'error' in ctx:
+        error = ctx['error']
+        if ctx['failed_stage'] in ('sign_tx', 'submit', 'confirm', 'start'):
+            error = f"Failed to activate mining: {str(error)}"
+        entry = {
+            'wallet': ctx['wallet'],
+            'address': ctx['address'],
+            'proxy': ctx['proxy'],
+            'status': f'Error: {str(error)}',
+            'time_left': '-',
+            'total_time': '-',
+            'initial_reward': 0,
+            'final_reward': 0,
+            'reward_change': 0,
+            'proxy_error': is_proxy_failure(ctx['error'])
+        }
+    else:
+        entry = {
+            'wallet': ctx['wallet'],
+            'address': ctx['address'],
+            'proxy': ctx['proxy'],
+            'status': ctx['status'],
+            'time_left': ctx['time_left'],
+            'total_time': ctx['total_time'],
+            'initial_reward': ctx['initial_reward'],
+            'final_reward': ctx['final_reward'],
+            'reward_change': ctx['final_reward'] - ctx['initial_reward']
+        }
+    if 'proxy_healthy' in ctx:
+        entry['proxy_healthy'] = ctx['proxy_healthy']
+    return entry
+
+def start_multi_mining(wallet_storage: WalletStorage, proxy_storage: ProxyStorage, selected_wallets: list,
+                       stage_limits: dict = None, token_cache: TokenCache = None, bulk_activation: bool = False,
+                       status_index: StatusIndex = None, on_result=None,
+                       wallet_deadline: float = DEFAULT_WALLET_DEADLINE, health: ProxyHealth = None,
+                       skip_unhealthy: bool = False):
+    """Start mining for multiple wallets with random delays
+    Wallets move through login, status check, transaction signing and submit, receipt
+    confirmation and API start independently; stage_limits caps how many
+    wallets may be in each stage at once. A wallet still going after
+    wallet_deadline seconds is cancelled and reported as an error. With
+    bulk_activation, all activation transactions are broadcast first and
+    confirmed together.
+    Outcomes are written to status_index when given, and on_result(entry)
+    gets each wallet's summary entry as soon as that wallet finishes.
+    With a ProxyHealth table, entries carry proxy_healthy; with
+    skip_unhealthy, wallets whose proxy is unhealthy are reported as
+    errors without being tried.
+    """
+    stage_limits = {**DEFAULT_STAGE_LIMITS, **(stage_limits or {})}
     results = []
     total_reward = 0
     
@@ -321,101 +640,83 @@ def start_multi_mining(wallet_storage: WalletStorage, proxy_storage: ProxyStorag
     print(f"\n=== Starting Mining for {len(random_wallets)} Wallets ===")
     print("Note: Processing in random order with random delays")
     
+    unhealthy = set()
+    if health:
+        unhealthy = proxy_storage.get_unhealthy_wallets([address for _, address in random_wallets], health)
+    
+    contexts = []
+    skipped = []
     for wallet_name, address in random_wallets:
-        try:
-            # Random delay between operations (1-20 seconds)
-            delay = random.randint(1, 20)
-            print(f"\nProcessing {wallet_name} ({address})...")
-            print(f"Waiting {delay} seconds before proceeding...")
-            time.sleep(delay)
-            
-            private_key, _ = wallet_storage.get_wallet(wallet_name)
-            proxy_settings = proxy_storage.get_proxy(address)
-            
-            if not proxy_settings:
-                print("Warning: No proxy configured for this wallet!")
-                proxy_url = "No proxy"
-            else:
-                proxy_url = format_proxy_url(proxy_settings)
-                print(f"Using proxy: {proxy_url}")
-            
-            print(f"Connecting wallet {wallet_name}...")
-            bot = TakerBot(private_key, proxy_settings)
-            print("Logging in to Taker Protocol...")
-            bot.login()
-            
-            # Get initial user info and rewards
-            initial_info = bot.get_user_info()
-            initial_reward = float(initial_info['data']['totalReward'])
-            print(f"Initial Total Reward: {initial_reward} TAKER")
-            
-            # Check if already mining
-            is_mining = bot.check_mining_status()
-            if is_mining:
-                print("Wallet is already mining, skipping activation...")
-                mining_time = bot.get_total_mining_time()
-                last_time = mining_time['data']['lastMiningTime']
-                total_time = mining_time['data']['totalMiningTime']
-                current_time = int(time.time())
-                time_left = (last_time + 24*60*60) - current_time
-                
-                # Get updated user info
-                final_info = bot.get_user_info()
-                final_reward = float(final_info['data']['totalReward'])
-                reward_change = final_reward - initial_reward
-                
-                status = {
-                    'wallet': wallet_name,
-                    'address': address,
-                    'proxy': proxy_url,
-                    'status': 'Already Mining',
-                    'time_left': f"{time_left//3600}h {(time_left%3600)//60}m" if time_left > 0 else "Ready",
-                    'total_time': f"{total_time/3600:.1f}h",
-                    'initial_reward': initial_reward,
-                    'final_reward': final_reward,
-                    'reward_change': reward_change
-                }
-            else:
-                print("Activating mining process...")
-                bot.activate_mining()
-                
-                # Get updated user info after activation
-                time.sleep(2)  # Wait briefly for update
-                final_info = bot.get_user_info()
-                final_reward = float(final_info['data']['totalReward'])
-                reward_change = final_reward - initial_reward
-                
-                status = {
-                    'wallet': wallet_name,
-                    'address': address,
-                    'proxy': proxy_url,
-                    'status': 'Mining Started',
-                    'time_left': '24h 0m',
-                    'total_time': '0h',
-                    'initial_reward': initial_reward,
-                    'final_reward': final_reward,
-                    'reward_change': reward_change
-                }
-            
-            results.append(status)
-            total_reward += final_reward
-            print(f"Success: {status['status']}")
-            print(f"Final Total Reward: {final_reward} TAKER")
-            print(f"Reward Change: {'+' if reward_change >= 0 else ''}{reward_change} TAKER")
-            
-        except Exception as e:
-            results.append({
-                'wallet': wallet_name,
-                'address': address,
-                'proxy': proxy_url if 'proxy_url' in locals() else "Unknown",
-                'status': f'Error: {str(e)}',
-                'time_left': '-',
-                'total_time': '-',
-                'initial_reward': 0,
-                'final_reward': 0,
-                'reward_change': 0
+        proxy_settings = proxy_storage.get_proxy(address)
+        ctx = {
+            'wallet': wallet_name,
+            'address': address,
+            'proxy_settings': proxy_settings,
+            'proxy': format_proxy_url(proxy_settings) if proxy_settings else "No proxy",
+            'delay': random.randint(1, 20),
+            'deadline_seconds': wallet_deadline,
+        }
+        if health:
+            ctx['proxy_healthy'] = address not in unhealthy
+        if skip_unhealthy and address in unhealthy:
+            ctx['error'] = ProxyError("Skipped: proxy failed its recent health checks")
+            ctx['failed_stage'] = 'health'
+            skipped.append(ctx)
+        else:
+            contexts.append(ctx)
+    if skipped:
+        print(f"Skipping {len(skipped)} wallets with unhealthy proxies")
+        if on_result:
+            for ctx in skipped:
+                on_result(_mining_result(ctx))
+    if not bulk_activation:
+        _attach_nonce_managers(contexts)
+    
+    def finished(ctx):
+        # In bulk mode, wallets that need activation finish after BulkActivator
+        if on_result and ('error' in ctx or ctx.get('done') or not bulk_activation):
+            on_result(_mining_result(ctx))
+    
+    # Reuse valid bearer tokens and write new ones once at the end
+    with token_cache.batch() if token_cache else nullcontext():
+        contexts = asyncio.run(_run_mining_pipeline(wallet_storage, contexts, stage_limits, token_cache,
+                                                    bulk_activation, finished))
+        if bulk_activation:
+            to_activate = [ctx for ctx in contexts if 'error' not in ctx and not ctx.get('done')]
+            if to_activate:
+                _bulk_activate(wallet_storage, to_activate, token_cache)
+                if on_result:
+                    for ctx in to_activate:
+                        on_result(_mining_result(ctx))
+    
+    if status_index:
+        status_index.record_many([
+            (ctx['address'], {'last_error': str(ctx['error'])} if 'error' in ctx else {
+                'last_mining_time': ctx['last_mining_time'],
+                'total_mining_time': ctx['total_mining_time'],
+                'total_reward': ctx['final_reward'],
+                'reward_amount': ctx['user_info']['rewardAmount'],
+                'user_id': ctx['user_info']['userId'],
+                'invitation_code': ctx['user_info']['invitationCode'],
+                'invite_count': ctx['user_info']['inviteCount'],
             })
-            print(f"Error: {str(e)}")
+            for ctx in contexts
+        ])
+    
+    # Skipped wallets were never tried, so the index keeps their last known state
+    contexts += skipped
+    for ctx in contexts:
+        status = _mining_result(ctx)
+        results.append(status)
+        if 'error' in ctx:
+            print(f"{ctx['wallet']}: {status['status']}")
+            continue
+        
+        reward_change = status['reward_change']
+        total_reward += ctx['final_reward']
+        print(f"{ctx['wallet']}: Success: {status['status']}")
+        print(f"Final Total Reward: {ctx['final_reward']} TAKER")
+        print(f"Reward Change: {'+' if reward_change >= 0 else ''}{reward_change} TAKER")
     
     # Display summary
     print("\n=== Mining Summary ===")
@@ -430,11 +731,14 @@ def start_multi_mining(wallet_storage: WalletStorage, proxy_storage: ProxyStorag
     print(f"Successfully Activated: {active_count - skipped_count}")
     print(f"Already Mining (Skipped): {skipped_count}")
     print(f"Failed/Error: {error_count}")
+    print(f"Proxy Failures: {sum(1 for r in results if r.get('proxy_error'))}")
     
     for result in results:
         print(f"\n{result['wallet']} ({result['address']})")
-        print(f"Proxy: {result['proxy']}")
+        print(f"Proxy: {result['proxy']}{' (UNHEALTHY)' if result.get('proxy_healthy') is False else ''}")
         print(f"Status: {result['status']}")
+        if result.get('proxy_error'):
+            print("Cause: Proxy failure")
         if result['time_left'] != '-':
             print(f"Time Left: {result['time_left']}")
             print(f"Total Mining Time: {result['total_time']}")
@@ -442,6 +746,8 @@ def start_multi_mining(wallet_storage: WalletStorage, proxy_storage: ProxyStorag
             print(f"Initial Reward: {result['initial_reward']} TAKER")
             print(f"Final Reward: {result['final_reward']} TAKER")
             print(f"Reward Change: {'+' if result['reward_change'] >= 0 else ''}{result['reward_change']} TAKER")
+    
+    return results
 
 def parse_wallet_selection(selection: str, total_wallets: int) -> list:
     """Parse wallet selection string into list of wallet numbers"""
@@ -474,111 +780,322 @@ def parse_wallet_selection(selection: str, total_wallets: int) -> list:
     
     return sorted(list(selected))
 
-def check_all_accounts_status(wallet_storage: WalletStorage, proxy_storage: ProxyStorage):
-    """Check mining status and rewards for all accounts"""
+async def _check_account_status(wallet_storage: WalletStorage, wallet_name: str, address: str,
+                                proxy_settings: dict, session: "aiohttp.ClientSession",
+                                token_cache: TokenCache = None,
+                                wallet_deadline: float = DEFAULT_WALLET_DEADLINE,
+                                chain_state=NOT_READ) -> dict:
+    """Login to one wallet and collect its mining status and rewards
+    The check is cancelled and reported as an error after wallet_deadline seconds.
+    chain_state is the wallet's batched on-chain read, if one was made.
+    """
+    proxy_url = format_proxy_url(proxy_settings) if proxy_settings else "No proxy"
+    try:
+        print(f"Processing {wallet_name} ({address})...")
+        private_key, _ = wallet_storage.get_wallet(wallet_name)
+        
+        deadline = Deadline(wallet_deadline)
+        bot = AsyncTakerBot(private_key, proxy_settings, session=session, token_cache=token_cache,
+                            deadline=deadline)
+        
+        async def fetch():
+            await bot.login()
+            # Get user info and mining status
+            return await bot.get_user_info(), await bot.check_mining_status(chain_state)
+        
+        try:
+            user_info, chain_status = await asyncio.wait_for(fetch(), deadline.remaining())
+        except asyncio.TimeoutError:
+            if deadline.expired:
+                raise DeadlineExceeded(f"Deadline of {wallet_deadline:g}s exceeded")
+            raise
+        finally:
+            await bot.close()
+        
+        if chain_status:
+            total_time = chain_status.total_mining_time
+            time_left = chain_status.time_left
+            
+            mining_status = {
+                'status': 'Active',
+                'time_left': f"{time_left//3600}h {(time_left%3600)//60}m" if time_left > 0 else "Ready",
+                'total_time': f"{total_time/3600:.1f}h"
+            }
+        else:
+            mining_status = {
+                'status': 'Inactive',
+                'time_left': '-',
+                'total_time': '-'
+            }
+        
+        reward = float(user_info['data']['totalReward'])
+        print(f"{wallet_name}: Mining {mining_status['status']}, Reward: {reward} TAKER")
+        
+        return {
+            'wallet': wallet_name,
+            'address': address,
+            'proxy': proxy_url,
+            'mining': mining_status,
+            'reward': reward,
+            'last_mining_time': chain_status.last_mining_time,
+            'total_mining_time': chain_status.total_mining_time,
+            'user_info': {
+                'userId': user_info['data']['userId'],
+                'invitationCode': user_info['data']['invitationCode'],
+                'rewardAmount': user_info['data']['rewardAmount'],
+                'inviteCount': user_info['data']['inviteCount']
+            }
+        }
+        
+    except Exception as e:
+        print(f"{wallet_name}: Error: {str(e)}")
+        return _error_result(wallet_name, address, proxy_url, e)
+
+def _error_result(wallet_name: str, address: str, proxy_url: str, error: Exception) -> dict:
+    """Build the account check result for a wallet whose check failed"""
+    return {
+        'wallet': wallet_name,
+        'address': address,
+        'proxy': proxy_url,
+        'mining': {'status': 'Error', 'time_left': '-', 'total_time': '-'},
+        'reward': 0,
+        'user_info': None,
+        'error': str(error),
+        'proxy_error': is_proxy_failure(error)
+    }
+
+# The batched read only saves requests, so it gets one short attempt
+CHAIN_STATE_TIMEOUTS = Timeouts(connect=5, read=10)
+
+async def _read_chain_states(proxy_settings: dict, addresses: list, executor: ThreadPoolExecutor) -> dict:
+    """Batch-read on-chain mining state for one proxy group's wallets
+    A single short attempt: if it fails, the group's wallets fall back to
+    their own eth_call rather than waiting out retries.
+    """
+    client = RpcClient(proxy_settings=proxy_settings, timeouts=CHAIN_STATE_TIMEOUTS, retry=NO_RETRY)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, read_mining_states, addresses, client)
+    except Exception as e:
+        print(f"Batched on-chain status read failed: {str(e)}")
+        return {}
+
+async def _check_all_accounts_async(wallet_storage: WalletStorage, proxy_storage: ProxyStorage,
+                                    wallets: list, runner: FleetRunner, token_cache: TokenCache = None,
+                                    on_result=None, wallet_deadline: float = DEFAULT_WALLET_DEADLINE) -> list:
+    """Check every wallet through the runner, sharing one HTTP connection pool
+    Proxies shared by several wallets get one batched on-chain read, which
+    starts right away; each wallet waits only for its own proxy's read.
+    """
+    jobs = []
+    groups = {}
+    for wallet_name, address in wallets:
+        proxy_settings = proxy_storage.get_proxy(address)
+        proxy_key = proxy_settings['http'] if proxy_settings else None
+        jobs.append((proxy_key, (wallet_name, address, proxy_settings)))
+        groups.setdefault(proxy_key, (proxy_settings, []))[1].append(address)
+    # A batch of one saves nothing over the wallet's own eth_call
+    groups = {proxy_key: group for proxy_key, group in groups.items() if len(group[1]) > 1}
+    
+    import aiohttp
+    connector = aiohttp.TCPConnector(limit=runner.concurrency)
+    with ThreadPoolExecutor(max_workers=max(1, min(len(groups), runner.concurrency))) as executor:
+        reads = {
+            proxy_key: asyncio.ensure_future(_read_chain_states(proxy_settings, addresses, executor))
+            for proxy_key, (proxy_settings, addresses) in groups.items()
+        }
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async def worker(wallet_name, address, proxy_settings):
+                proxy_key = proxy_settings['http'] if proxy_settings else None
+                chain_state = NOT_READ
+                if proxy_key in reads:
+                    chain_state = (await reads[proxy_key]).get(address, NOT_READ)
+                return await _check_account_status(wallet_storage, wallet_name, address, proxy_settings, session,
+                                                   token_cache, wallet_deadline, chain_state)
+            return await runner.run(jobs, worker, on_result)
+
+def _index_updates(results: list) -> list:
+    """Turn account check results into StatusIndex (address, fields) updates"""
+    updates = []
+    for result in results:
+        if 'error' in result:
+            updates.append((result['address'], {'last_error': result['error']}))
+            continue
+        updates.append((result['address'], {
+            'last_mining_time': result['last_mining_time'],
+            'total_mining_time': result['total_mining_time'],
+            'total_reward': result['reward'],
+            'reward_amount': result['user_info']['rewardAmount'],
+            'user_id': result['user_info']['userId'],
+            'invitation_code': result['user_info']['invitationCode'],
+            'invite_count': result['user_info']['inviteCount'],
+        }))
+    return updates
+
+def _result_from_index(wallet_name: str, address: str, proxy_settings: dict, row: dict, now: int) -> dict:
+    """Build an account check result from a StatusIndex row"""
+    time_left = mining_expiry(row) - now
+    if time_left > 0:
+        mining_status = {
+            'status': 'Active',
+            'time_left': f"{time_left//3600}h {(time_left%3600)//60}m",
+            'total_time': f"{(row['total_mining_time'] or 0)/3600:.1f}h"
+        }
+    else:
+        mining_status = {'status': 'Inactive', 'time_left': '-', 'total_time': '-'}
+    return {
+        'wallet': wallet_name,
+        'address': address,
+        'proxy': format_proxy_url(proxy_settings) if proxy_settings else "No proxy",
+        'mining': mining_status,
+        'reward': row['total_reward'] or 0,
+        'user_info': {
+            'userId': row['user_id'],
+            'invitationCode': row['invitation_code'],
+            'rewardAmount': row['reward_amount'],
+            'inviteCount': row['invite_count']
+        },
+        'last_checked': row['last_checked']
+    }
+
+def collect_account_status(wallet_storage: WalletStorage, proxy_storage: ProxyStorage, wallets: list,
+                           concurrency: int = DEFAULT_CONCURRENCY, per_proxy: int = DEFAULT_PER_PROXY,
+                           token_cache: TokenCache = None, status_index: StatusIndex = None,
+                           fast: bool = False, max_age: int = DEFAULT_MAX_AGE, on_result=None,
+                           wallet_deadline: float = DEFAULT_WALLET_DEADLINE, health: ProxyHealth = None,
+                           skip_unhealthy: bool = False) -> list:
+    """Check mining status and rewards for wallets, returning one result per wallet
+    Wallets are checked concurrently, at most `concurrency` at a time and
+    at most `per_proxy` through any single proxy, each within wallet_deadline
+    seconds. Results are written to
+    status_index; with fast, wallets whose index row is still fresh are
+    reported from the index without touching the network. on_result(result)
+    gets each result as soon as it is known. With a ProxyHealth table,
+    results carry proxy_healthy; with skip_unhealthy, wallets whose proxy
+    is unhealthy are reported as errors without being checked.
+    """
+    unhealthy = set()
+    if health:
+        unhealthy = proxy_storage.get_unhealthy_wallets([address for _, address in wallets], health)
+    
+    def finished(result):
+        if health:
+            result['proxy_healthy'] = result['address'] not in unhealthy
+        if on_result:
+            on_result(result)
+    
+    indexed = {}
+    to_check = wallets
+    if status_index and fast:
+        now = int(time.time())
+        rows = status_index.get_many([address for _, address in wallets])
+        for wallet_name, address in wallets:
+            row = rows.get(address)
+            if not is_stale(row, now, max_age):
+                indexed[address] = _result_from_index(wallet_name, address, proxy_storage.get_proxy(address),
+                                                      row, now)
+        to_check = [(wallet_name, address) for wallet_name, address in wallets if address not in indexed]
+        print(f"{len(indexed)} accounts answered from the status index, {len(to_check)} to check\n")
+        for result in indexed.values():
+            finished(result)
+    
+    skipped = {}
+    if skip_unhealthy:
+        for wallet_name, address in to_check:
+            if address in unhealthy:
+                proxy_settings = proxy_storage.get_proxy(address)
+                skipped[address] = _error_result(wallet_name, address, format_proxy_url(proxy_settings),
+                                                 ProxyError("Skipped: proxy failed its recent health checks"))
+                finished(skipped[address])
+        to_check = [(wallet_name, address) for wallet_name, address in to_check if address not in skipped]
+        if skipped:
+            print(f"Skipping {len(skipped)} accounts with unhealthy proxies\n")
+    
+    checked = []
+    if to_check:
+        runner = FleetRunner(concurrency, per_proxy)
+        # Reuse valid bearer tokens and write new ones once at the end
+        with token_cache.batch() if token_cache else nullcontext():
+            checked = asyncio.run(_check_all_accounts_async(wallet_storage, proxy_storage, to_check, runner,
+                                                            token_cache, finished, wallet_deadline))
+        if status_index:
+            status_index.record_many(_index_updates(checked))
+    
+    checked = {result['address']: result for result in checked}
+    return [indexed.get(address) or skipped.get(address) or checked[address] for _, address in wallets]
+
+def check_all_accounts_status(wallet_storage: WalletStorage, proxy_storage: ProxyStorage,
+                              concurrency: int = DEFAULT_CONCURRENCY, per_proxy: int = DEFAULT_PER_PROXY,
+                              token_cache: TokenCache = None, status_index: StatusIndex = None,
+                              fast: bool = False, max_age: int = DEFAULT_MAX_AGE, health: ProxyHealth = None,
+                              skip_unhealthy: bool = False):
+    """Check mining status and rewards for all accounts and print a summary
+    See collect_account_status for how wallets are checked.
+    """
     wallets = wallet_storage.list_wallets()
     if not wallets:
         print("\nNo wallets found!")
         return
-        
-    results = []
-    total_reward = 0
-    active_mining = 0
     
     print(f"\n=== Checking Status for {len(wallets)} Accounts ===\n")
+    results = collect_account_status(wallet_storage, proxy_storage, wallets, concurrency, per_proxy, token_cache,
+                                     status_index, fast, max_age, health=health, skip_unhealthy=skip_unhealthy)
     
-    for wallet_name, address in wallets:
-        try:
-            print(f"Processing {wallet_name} ({address})...")
-            private_key, _ = wallet_storage.get_wallet(wallet_name)
-            proxy_settings = proxy_storage.get_proxy(address)
-            
-            if not proxy_settings:
-                proxy_url = "No proxy"
-            else:
-                proxy_url = format_proxy_url(proxy_settings)
-            
-            bot = TakerBot(private_key, proxy_settings)
-            bot.login()
-            
-            # Get user info and mining status
-            user_info = bot.get_user_info()
-            is_mining = bot.check_mining_status()
-            
-            if is_mining:
-                active_mining += 1
-                mining_time = bot.get_total_mining_time()
-                last_time = mining_time['data']['lastMiningTime']
-                total_time = mining_time['data']['totalMiningTime']
-                current_time = int(time.time())
-                time_left = (last_time + 24*60*60) - current_time
-                
-                mining_status = {
-                    'status': 'Active',
-                    'time_left': f"{time_left//3600}h {(time_left%3600)//60}m" if time_left > 0 else "Ready",
-                    'total_time': f"{total_time/3600:.1f}h"
-                }
-            else:
-                mining_status = {
-                    'status': 'Inactive',
-                    'time_left': '-',
-                    'total_time': '-'
-                }
-            
-            reward = float(user_info['data']['totalReward'])
-            total_reward += reward
-            
-            result = {
-                'wallet': wallet_name,
-                'address': address,
-                'proxy': proxy_url,
-                'mining': mining_status,
-                'reward': reward,
-                'user_info': {
-                    'userId': user_info['data']['userId'],
-                    'invitationCode': user_info['data']['invitationCode'],
-                    'rewardAmount': user_info['data']['rewardAmount'],
-                    'inviteCount': user_info['data']['inviteCount']
-                }
-            }
-            
-            results.append(result)
-            print(f"Success: Mining {mining_status['status']}, Reward: {reward} TAKER")
-            
-        except Exception as e:
-            print(f"Error: {str(e)}")
-            results.append({
-                'wallet': wallet_name,
-                'address': address,
-                'proxy': proxy_url if 'proxy_url' in locals() else "Unknown",
-                'mining': {'status': 'Error', 'time_left': '-', 'total_time': '-'},
-                'reward': 0,
-                'user_info': None
-            })
+    total_reward = sum(result['reward'] for result in results)
+    active_mining = sum(1 for result in results if result['mining']['status'] == 'Active')
     
     # Display summary
     print("\n=== Account Status Summary ===")
     print(f"\nTotal Accounts: {len(wallets)}")
     print(f"Active Mining: {active_mining}")
     print(f"Inactive/Error: {len(wallets) - active_mining}")
+    print(f"Proxy Failures: {sum(1 for result in results if result.get('proxy_error'))}")
     print(f"Total Reward: {total_reward} TAKER")
     
     print("\nDetailed Status:")
     for result in results:
         print(f"\n{result['wallet']} ({result['address']})")
-        print(f"Proxy: {result['proxy']}")
+        print(f"Proxy: {result['proxy']}{' (UNHEALTHY)' if result.get('proxy_healthy') is False else ''}")
         print(f"Mining Status: {result['mining']['status']}")
+        if result.get('proxy_error'):
+            print("Cause: Proxy failure")
         if result['mining']['status'] == 'Active':
             print(f"Time Left: {result['mining']['time_left']}")
             print(f"Total Mining Time: {result['mining']['total_time']}")
         print(f"Reward: {result['reward']} TAKER")
+        if 'last_checked' in result:
+            print(f"Last Checked: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(result['last_checked']))}")
         if result['user_info']:
             print(f"User ID: {result['user_info']['userId']}")
             print(f"Invitation Code: {result['user_info']['invitationCode']}")
             print(f"Reward Amount: {result['user_info']['rewardAmount']} TAKER")
             print(f"Invite Count: {result['user_info']['inviteCount']}")
 
-def main_menu(wallet_storage: WalletStorage, proxy_storage: ProxyStorage):
+def run_mining_scheduler(wallet_storage: WalletStorage, proxy_storage: ProxyStorage, status_index: StatusIndex,
+                         token_cache: TokenCache = None, stage_limits: dict = None):
+    """Renew mining for every wallet as its 24h period ends, until Ctrl+C
+    Wallets are only woken when they are due; each due batch goes
+    through start_multi_mining, whose stage limits bound concurrency.
+    """
+    wallets = wallet_storage.list_wallets()
+    if not wallets:
+        print("\nNo wallets found!")
+        return
+    
+    def renew(due_wallets):
+        start_multi_mining(wallet_storage, proxy_storage, due_wallets, stage_limits, token_cache,
+                           status_index=status_index)
+    
+    scheduler = MiningScheduler(status_index, renew)
+    scheduler.seed(wallets)
+    print(f"\n=== Mining Scheduler: {len(wallets)} Wallets ===")
+    print("Press Ctrl+C to stop")
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("\nScheduler stopped")
+
+def main_menu(wallet_storage: WalletStorage, proxy_storage: ProxyStorage, token_cache: TokenCache = None,
+              status_index: StatusIndex = None, proxy_health: ProxyHealth = None):
     while True:
         clear_screen()
         print("\n=== Taker Protocol Bot ===")
@@ -589,9 +1106,10 @@ def main_menu(wallet_storage: WalletStorage, proxy_storage: ProxyStorage):
         print("5. Manage Proxies")
         print("6. Start Mining")
         print("7. Check All Accounts Status")
-        print("8. Exit")
+        print("8. Run Mining Scheduler")
+        print("9. Exit")
         
-        choice = input("\nSelect option (1-8): ")
+        choice = input("\nSelect option (1-9): ")
         
         if choice == "1":
             try:
@@ -704,7 +1222,7 @@ def main_menu(wallet_storage: WalletStorage, proxy_storage: ProxyStorage):
                 input("\nPress Enter to continue...")
                 
         elif choice == "5":
-            proxy_management_menu(proxy_storage, wallet_storage)
+            proxy_management_menu(proxy_storage, wallet_storage, proxy_health)
             
         elif choice == "6":
             wallets = wallet_storage.list_wallets()
@@ -759,8 +1277,15 @@ def main_menu(wallet_storage: WalletStorage, proxy_storage: ProxyStorage):
                 # Get selected wallets
                 selected_wallets = [wallets[i-1] for i in selected_numbers]
                 
+                bulk = input("\nSubmit all activation transactions first? (y/n): ").lower() == 'y'
+                skip_unhealthy = False
+                if proxy_health:
+                    skip_unhealthy = input("Skip wallets whose proxy is unhealthy? (y/n): ").lower() == 'y'
+                
                 # Start mining for selected wallets
-                start_multi_mining(wallet_storage, proxy_storage, selected_wallets)
+                start_multi_mining(wallet_storage, proxy_storage, selected_wallets, token_cache=token_cache,
+                                   bulk_activation=bulk, status_index=status_index, health=proxy_health,
+                                   skip_unhealthy=skip_unhealthy)
                 input("\nPress Enter to continue...")
                 
             except ValueError as e:
@@ -771,10 +1296,25 @@ def main_menu(wallet_storage: WalletStorage, proxy_storage: ProxyStorage):
                 input("\nPress Enter to continue...")
                 
         elif choice == "7":
-            check_all_accounts_status(wallet_storage, proxy_storage)
+            fast = False
+            if status_index:
+                fast = input("\nFast report from the status index? (y/n): ").strip().lower() == 'y'
+            skip_unhealthy = False
+            if proxy_health:
+                skip_unhealthy = input("Skip accounts whose proxy is unhealthy? (y/n): ").strip().lower() == 'y'
+            check_all_accounts_status(wallet_storage, proxy_storage, token_cache=token_cache,
+                                      status_index=status_index, fast=fast, health=proxy_health,
+                                      skip_unhealthy=skip_unhealthy)
             input("\nPress Enter to continue...")
             
         elif choice == "8":
+            if not status_index:
+                print("\nScheduler needs the status index!")
+            else:
+                run_mining_scheduler(wallet_storage, proxy_storage, status_index, token_cache)
+            input("\nPress Enter to continue...")
+            
+        elif choice == "9":
             print("\nExiting...")
             sys.exit(0)
         
@@ -789,8 +1329,13 @@ def main():
     while True:
         try:
             password = getpass("\nEnter storage password: ")
+            # Derive the storage keys in parallel while the stores initialize
+            prefetch_keys(password, [WALLET_SALT_FILE, PROXY_SALT_FILE, TOKEN_SALT_FILE])
             wallet_storage = WalletStorage(password)
             proxy_storage = ProxyStorage(password)
+            token_cache = TokenCache(password)
+            status_index = StatusIndex()
+            proxy_health = ProxyHealth()
             break
         except Exception as e:
             print(f"\nError: {str(e)}")
@@ -798,7 +1343,7 @@ def main():
             if retry != 'y':
                 sys.exit(1)
     
-    main_menu(wallet_storage, proxy_storage)
+    main_menu(wallet_storage, proxy_storage, token_cache, status_index, proxy_health)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
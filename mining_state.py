@@ -0,0 +1,20 @@
+from rpc import RpcClient, DEFAULT_BATCH_SIZE, decode_word
+from taker_bot import MINING_CONTRACT, ACTIVATE_MINING_SELECTOR
+
+def read_mining_states(addresses: list, client: RpcClient = None, mining_contract: str = MINING_CONTRACT,
+                       batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """Read on-chain mining state for many wallets in a few RPC round trips
+    The active() probe that check_mining_status sends must run with each
+    wallet as msg.sender, so it can't go through Multicall aggregate();
+    instead one eth_call per wallet is packed into JSON-RPC batches.
+    Returns {address: decoded int, None for empty return data, or Exception}.
+    """
+    client = client or RpcClient()
+    calls = [
+        ("eth_call", [{"to": mining_contract, "data": ACTIVATE_MINING_SELECTOR, "from": address}, "latest"])
+        for address in addresses
+    ]
+    return {
+        address: result if isinstance(result, Exception) else decode_word(bytes.fromhex(result[2:]))
+        for address, result in zip(addresses, client.batch(calls, batch_size))
+    }
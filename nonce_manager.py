@@ -0,0 +1,80 @@
+import threading
+from rpc import RpcClient, DEFAULT_BATCH_SIZE
+
+# Node error messages that mean our local nonce is out of step with the chain
+NONCE_ERRORS = (
+    "nonce too low",
+    "nonce too high",
+    "already known",
+    "replacement transaction underpriced",
+    "known transaction",
+)
+
+def is_nonce_error(error) -> bool:
+    """Check whether a send error means the nonce must be resynced"""
+    message = str(error).lower()
+    return any(text in message for text in NONCE_ERRORS)
+
+class NonceManager:
+    """Track pending nonces for many addresses locally
+
+    Nonces are fetched for all addresses in one batched
+    eth_getTransactionCount("pending") call, then handed out and
+    incremented locally, so sending a transaction costs one network call.
+    Call resync() when a send fails with a nonce error.
+    """
+
+    def __init__(self, client: RpcClient = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Initialize with an RPC client used for (re)syncing nonces"""
+        self.client = client or RpcClient()
+        self.batch_size = batch_size
+        self._nonces = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, addresses: list) -> dict:
+        """Fetch pending nonces for addresses not tracked yet
+        Returns {address: Exception} for addresses whose fetch failed.
+        """
+        with self._lock:
+            missing = [address for address in addresses if address.lower() not in self._nonces]
+        if not missing:
+            return {}
+
+        calls = [("eth_getTransactionCount", [address, "pending"]) for address in missing]
+        errors = {}
+        try:
+            results = self.client.batch(calls, self.batch_size)
+        except Exception as e:
+            # Proxy or node unreachable (or its circuit is open); none of the nonces arrived
+            return {address: e for address in missing}
+        with self._lock:
+            for address, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    errors[address] = result
+                else:
+                    self._nonces.setdefault(address.lower(), int(result, 16))
+        return errors
+
+    def next_nonce(self, address: str) -> int:
+        """Reserve and return the next nonce for address"""
+        if address.lower() not in self._nonces:
+            errors = self.prefetch([address])
+            if errors:
+                raise Exception(f"Failed to get nonce: {str(errors[address])}")
+        with self._lock:
+            nonce = self._nonces[address.lower()]
+            self._nonces[address.lower()] = nonce + 1
+            return nonce
+
+    def release(self, address: str, nonce: int):
+        """Give back a reserved nonce whose transaction never reached the node"""
+        with self._lock:
+            if self._nonces.get(address.lower()) == nonce + 1:
+                self._nonces[address.lower()] = nonce
+
+    def resync(self, addresses: list) -> dict:
+        """Forget local nonces for addresses and fetch them again from the chain"""
+        with self._lock:
+            for address in addresses:
+                self._nonces.pop(address.lower(), None)
+        return self.prefetch(addresses)
@@ -0,0 +1,25 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_CHUNK_SIZE = 256
+# Below this many items a process pool costs more than it saves
+DEFAULT_MIN_PARALLEL = 1024
+
+def map_chunked(func, items: list, chunk_size: int = DEFAULT_CHUNK_SIZE, max_workers: int = None,
+                min_parallel: int = DEFAULT_MIN_PARALLEL) -> list:
+    """Apply a chunk function to items in a process pool
+    func must be a module-level function taking a list of items and
+    returning one result per item. Results come back in input order.
+    Small inputs, or machines with a single CPU, run in-process.
+    """
+    items = list(items)
+    max_workers = max_workers or os.cpu_count() or 1
+    if len(items) < min_parallel or max_workers < 2:
+        return func(items)
+    
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        for chunk_results in pool.map(func, chunks):
+            results.extend(chunk_results)
+    return results
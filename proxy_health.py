@@ -0,0 +1,156 @@
+import time
+import socket
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from proxy_storage import proxy_key, to_requests_proxies
+from timeouts import Timeouts, DEFAULT_TIMEOUTS
+
+HEALTH_FILE = "proxy_health.db"
+# Probe through the proxy to the API the bots log in to
+DEFAULT_PROBE_URL = "https://lightmining-api.taker.xyz"
+DEFAULT_PROBE_CONCURRENCY = 20
+# Weight of the newest probe in the smoothed latency and error rate
+SMOOTHING = 0.3
+# A proxy is unhealthy after this many failed probes in a row, or above this error rate
+DEFAULT_MAX_CONSECUTIVE_FAILURES = 3
+DEFAULT_MAX_ERROR_RATE = 0.5
+
+def probe_proxy(proxy_data: dict, target: str = DEFAULT_PROBE_URL, timeouts: Timeouts = None) -> dict:
+    """Measure one proxy: TCP connect time to the proxy, then time to first byte from target through it
+    Returns {'connect_ms', 'ttfb_ms', 'error'}; error is None on success.
+    Any HTTP answer from target counts as success except 407 and 5xx,
+    which proxies use to report their own failures.
+    """
+    import requests
+    timeouts = timeouts or DEFAULT_TIMEOUTS
+    result = {'connect_ms': None, 'ttfb_ms': None, 'error': None}
+    try:
+        started = time.monotonic()
+        with socket.create_connection((proxy_data['host'], int(proxy_data['port'])), timeout=timeouts.connect):
+            result['connect_ms'] = (time.monotonic() - started) * 1000
+
+        # A fresh session so the probe pays for its own handshakes
+        with requests.Session() as session:
+            started = time.monotonic()
+            with session.get(target, proxies=to_requests_proxies(proxy_data), stream=True,
+                             timeout=timeouts.for_requests()) as response:
+                result['ttfb_ms'] = (time.monotonic() - started) * 1000
+                if response.status_code == 407 or response.status_code >= 500:
+                    result['error'] = f"HTTP {response.status_code}"
+    except Exception as e:
+        result['error'] = str(e) or type(e).__name__
+    return result
+
+def probe_proxies(proxy_list: list, target: str = DEFAULT_PROBE_URL, concurrency: int = DEFAULT_PROBE_CONCURRENCY,
+                  timeouts: Timeouts = None) -> dict:
+    """Probe proxies concurrently and return {proxy key: probe result}
+    Proxies shared by several wallets are probed once.
+    """
+    unique = {}
+    for proxy_data in proxy_list:
+        unique.setdefault(proxy_key(proxy_data), proxy_data)
+    if not unique:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(unique))) as pool:
+        results = pool.map(lambda proxy_data: probe_proxy(proxy_data, target, timeouts), unique.values())
+        return dict(zip(unique, results))
+
+def _smooth(old, new):
+    if new is None:
+        return old
+    if old is None:
+        return new
+    return old + SMOOTHING * (new - old)
+
+class ProxyHealth:
+    """Local SQLite table of measured proxy latency and error rate
+
+    Rows are keyed by proxy_key(), which hides the password. Latencies
+    and the error rate are exponentially smoothed over probes, so one
+    slow answer does not reorder the ranking.
+    """
+
+    def __init__(self, path: str = HEALTH_FILE):
+        """Open (and create if needed) the health database"""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS proxy_health (
+                    proxy TEXT PRIMARY KEY,
+                    connect_ms REAL,
+                    ttfb_ms REAL,
+                    error_rate REAL,
+                    probes INTEGER,
+                    failures INTEGER,
+                    consecutive_failures INTEGER,
+                    last_checked INTEGER,
+                    last_error TEXT
+                )
+            """)
+
+    def get_many(self, keys: list) -> dict:
+        """Return {proxy key: row dict} for the keys that have rows"""
+        rows = self.all()
+        return {key: rows[key] for key in keys if key in rows}
+
+    def all(self) -> dict:
+        """Return {proxy key: row dict} for every probed proxy"""
+        with self._lock:
+            return {row['proxy']: dict(row) for row in self._conn.execute("SELECT * FROM proxy_health")}
+
+    def record_many(self, results: dict):
+        """Fold {proxy key: probe result} into the table in one transaction"""
+        now = int(time.time())
+        with self._lock, self._conn:
+            for key, result in results.items():
+                row = self._conn.execute("SELECT * FROM proxy_health WHERE proxy = ?", (key,)).fetchone()
+                row = dict(row) if row else {'connect_ms': None, 'ttfb_ms': None, 'error_rate': None,
+                                             'probes': 0, 'failures': 0, 'consecutive_failures': 0}
+                failed = result['error'] is not None
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO proxy_health VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key,
+                     _smooth(row['connect_ms'], result['connect_ms']),
+                     _smooth(row['ttfb_ms'], None if failed else result['ttfb_ms']),
+                     _smooth(row['error_rate'], float(failed)),
+                     row['probes'] + 1,
+                     row['failures'] + failed,
+                     row['consecutive_failures'] + 1 if failed else 0,
+                     now,
+                     result['error'])
+                )
+
+    def check(self, proxy_list: list, target: str = DEFAULT_PROBE_URL,
+              concurrency: int = DEFAULT_PROBE_CONCURRENCY, timeouts: Timeouts = None) -> dict:
+        """Probe proxies, record the results and return the updated rows"""
+        results = probe_proxies(proxy_list, target, concurrency, timeouts)
+        self.record_many(results)
+        return self.get_many(list(results))
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+def expected_cost(row: dict):
+    """Expected seconds per request through a proxy, or None if never answered
+    Time to first byte inflated by the error rate, since failed requests
+    are retried.
+    """
+    if not row or row['ttfb_ms'] is None:
+        return None
+    error_rate = min(row['error_rate'] or 0, 0.9)
+    return row['ttfb_ms'] / 1000 / (1 - error_rate)
+
+def is_healthy(row: dict, max_consecutive_failures: int = DEFAULT_MAX_CONSECUTIVE_FAILURES,
+               max_error_rate: float = DEFAULT_MAX_ERROR_RATE) -> bool:
+    """Check whether a proxy's health row allows using it; unprobed proxies count as healthy"""
+    if not row:
+        return True
+    return (row['consecutive_failures'] < max_consecutive_failures
+            and (row['error_rate'] or 0) <= max_error_rate)
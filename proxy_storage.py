@@ -1,11 +1,16 @@
-import os
 import json
-import base64
 import csv
+import heapq
 import urllib.parse
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from typing import TYPE_CHECKING
+from key_derivation import get_fernet, EncryptedJsonFile
+
+if TYPE_CHECKING:
+    from proxy_health import ProxyHealth
+
+SALT_FILE = "proxy_salt.key"
+# auto_assign_proxies strategies; round_robin ignores measurements
+ASSIGN_STRATEGIES = ("round_robin", "weighted")
 
 def parse_proxy_url(url: str) -> dict:
     """Parse proxy URL into components
@@ -78,51 +83,101 @@ def format_proxy_url(proxy_data: dict) -> str:
         
     return f"{proxy_data['protocol']}://{auth}{proxy_data['host']}:{proxy_data['port']}"
 
+def proxy_key(proxy_data: dict) -> str:
+    """Identify a proxy configuration by URL, hiding the password"""
+    if proxy_data.get('username'):
+        return f"{proxy_data['protocol']}://{proxy_data['username']}:****@{proxy_data['host']}:{proxy_data['port']}"
+    return f"{proxy_data['protocol']}://{proxy_data['host']}:{proxy_data['port']}"
+
+def weighted_assignment(proxy_list: list, wallet_count: int, health_rows: dict = None,
+                        max_per_proxy: int = None) -> list:
+    """Spread wallet_count wallets over proxies to minimize the slowest proxy's total time
+    Each proxy's time is its wallet count times its expected cost per
+    request, so every wallet goes to the proxy that would finish it
+    soonest. Unprobed proxies are assumed to cost the median; unhealthy
+    ones are only used once the healthy ones are full. Returns one
+    proxy dict per wallet, or None where max_per_proxy left no room.
+    """
+    from proxy_health import expected_cost, is_healthy
+    health_rows = health_rows or {}
+    unique = {}
+    for proxy_data in proxy_list:
+        unique.setdefault(proxy_key(proxy_data), proxy_data)
+    
+    costs = {key: expected_cost(health_rows.get(key)) for key in unique}
+    known = sorted(cost for cost in costs.values() if cost is not None)
+    default_cost = known[len(known) // 2] if known else 1.0
+    
+    # (tier, finish time with one more wallet, position, key, cost); unhealthy proxies are tier 1
+    heap = []
+    for position, key in enumerate(unique):
+        cost = costs[key] or default_cost
+        tier = 0 if is_healthy(health_rows.get(key)) else 1
+        heap.append((tier, cost, position, key, cost))
+    heapq.heapify(heap)
+    
+    counts = dict.fromkeys(unique, 0)
+    assignment = []
+    for _ in range(wallet_count):
+        if not heap:
+            assignment.append(None)
+            continue
+        tier, finish, position, key, cost = heapq.heappop(heap)
+        assignment.append(unique[key])
+        counts[key] += 1
+        if max_per_proxy is None or counts[key] < max_per_proxy:
+            heapq.heappush(heap, (tier, finish + cost, position, key, cost))
+    return assignment
+
+def to_requests_proxies(proxy_data: dict) -> dict:
+    """Build a requests-style proxies dict from stored proxy data"""
+    auth = f"{proxy_data['username']}:{proxy_data['password']}@" if proxy_data.get('username') else ""
+    proxy_url = f"{proxy_data['protocol']}://{auth}{proxy_data['host']}:{proxy_data['port']}"
+    
+    # Return in requests format
+    return {
+        'http': proxy_url,
+        'https': proxy_url
+    }
+
 class ProxyStorage:
     def __init__(self, storage_password):
         """Initialize proxy storage with encryption"""
         self.storage_file = "proxies_data.enc"
-        self.salt_file = "proxy_salt.key"
+        self.salt_file = SALT_FILE
+        # Prebuilt wallet address -> requests proxy dict index, and the proxies it was built from
+        self._proxy_index = {}
+        self._indexed = None
         self._init_encryption(storage_password)
         
     def _init_encryption(self, password):
         """Initialize encryption with password"""
-        if os.path.exists(self.salt_file):
-            with open(self.salt_file, "rb") as f:
-                salt = f.read()
-        else:
-            salt = os.urandom(16)
-            with open(self.salt_file, "wb") as f:
-                f.write(salt)
+        self.fernet = get_fernet(password, self.salt_file)
+        self._file = EncryptedJsonFile(self.storage_file, self.fernet)
 
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=480000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-        self.fernet = Fernet(key)
+    def _cached_proxies(self):
+        """Return the decrypted proxies, decrypting the file only when it changed
+        The returned dict is shared with the cache and must not be modified.
+        """
+        proxies_data = self._file.load()
+        if proxies_data is not self._indexed:
+            self._proxy_index = {
+                key: to_requests_proxies(data)
+                for key, data in proxies_data.items()
+                if not key.startswith('proxy_') and isinstance(data, dict)
+                and all(k in data for k in ['protocol', 'host', 'port'])
+            }
+            self._indexed = proxies_data
+        return proxies_data
 
     def _load_proxies(self):
         """Load all stored proxies"""
-        if not os.path.exists(self.storage_file):
-            return {}
-            
-        with open(self.storage_file, "rb") as f:
-            encrypted_data = f.read()
-        
-        try:
-            decrypted_data = json.loads(self.fernet.decrypt(encrypted_data))
-            return decrypted_data
-        except:
-            return {}
+        # Callers modify the result before saving, so hand out a copy
+        return dict(self._cached_proxies())
 
     def _save_proxies(self, proxies_data):
         """Save all proxies data"""
-        encrypted_data = self.fernet.encrypt(json.dumps(proxies_data).encode())
-        with open(self.storage_file, "wb") as f:
-            f.write(encrypted_data)
+        self._file.save(dict(proxies_data))
 
     def add_proxy(self, proxy_data: dict):
         """Add a proxy configuration without wallet assignment"""
@@ -139,21 +194,14 @@ class ProxyStorage:
 
     def get_proxy(self, wallet_address: str) -> dict:
         """Get proxy settings for a wallet"""
-        proxies = self._load_proxies()
-        proxy_data = proxies.get(wallet_address.lower())
+        self._cached_proxies()
+        proxy_settings = self._proxy_index.get(wallet_address.lower())
         
-        if not proxy_data:
+        if not proxy_settings:
             return None
             
-        # Format proxy URL
-        auth = f"{proxy_data['username']}:{proxy_data['password']}@" if proxy_data.get('username') else ""
-        proxy_url = f"{proxy_data['protocol']}://{auth}{proxy_data['host']}:{proxy_data['port']}"
-        
-        # Return in requests format
-        return {
-            'http': proxy_url,
-            'https': proxy_url
-        }
+        # Return a copy so callers can't alter the index
+        return dict(proxy_settings)
 
     def remove_proxy(self, wallet_address: str):
         """Remove proxy for a wallet"""
@@ -167,12 +215,15 @@ class ProxyStorage:
 
     def list_proxies(self) -> list:
         """List all stored proxies"""
-        proxies = self._load_proxies()
+        proxies = self._cached_proxies()
         return [(addr, data) for addr, data in proxies.items()]
 
-    def get_proxy_stats(self) -> dict:
-        """Get statistics about proxy usage"""
-        proxies = self._load_proxies()
+    def get_proxy_stats(self, health: "ProxyHealth" = None) -> dict:
+        """Get statistics about proxy usage
+        With a ProxyHealth table, also reports each proxy's measured
+        latency and error rate under 'proxy_health'.
+        """
+        proxies = self._cached_proxies()
         
         # Count unique proxy configurations
         unique_configs = {}
@@ -181,37 +232,71 @@ class ProxyStorage:
         
         for key, data in proxies.items():
             # Create a unique key for the proxy configuration
-            proxy_key = f"{data['protocol']}://{data['host']}:{data['port']}"
-            if data.get('username'):
-                proxy_key = f"{data['protocol']}://{data['username']}:****@{data['host']}:{data['port']}"
+            config_key = proxy_key(data)
             
             if key.startswith('proxy_'):
                 unassigned_count += 1
             else:
                 assigned_count += 1
             
-            if proxy_key not in unique_configs:
-                unique_configs[proxy_key] = {'count': 0, 'wallets': []}
+            if config_key not in unique_configs:
+                unique_configs[config_key] = {'count': 0, 'wallets': []}
             
-            unique_configs[proxy_key]['count'] += 1
+            unique_configs[config_key]['count'] += 1
             if not key.startswith('proxy_'):
-                unique_configs[proxy_key]['wallets'].append(key)
+                unique_configs[config_key]['wallets'].append(key)
         
-        return {
+        stats = {
             'total_proxies': len(unique_configs),
             'assigned_wallets': assigned_count,
             'unassigned_proxies': unassigned_count,
             'proxy_usage': {proxy: len(wallets['wallets']) for proxy, wallets in unique_configs.items()}
         }
+        if health is not None:
+            from proxy_health import is_healthy
+            rows = health.get_many(list(unique_configs))
+            stats['proxy_health'] = {
+                proxy: {**rows[proxy], 'healthy': is_healthy(rows[proxy])} if proxy in rows else None
+                for proxy in unique_configs
+            }
+            stats['unhealthy_proxies'] = sum(
+                1 for row in stats['proxy_health'].values() if row and not row['healthy']
+            )
+        return stats
+
+    def get_unhealthy_wallets(self, wallet_addresses: list, health: "ProxyHealth") -> set:
+        """Return the wallet addresses whose proxy's health row fails is_healthy()
+        Wallets without a proxy, or whose proxy was never probed, are not included.
+        """
+        from proxy_health import is_healthy
+        proxies = self._cached_proxies()
+        keys = {
+            address: proxy_key(proxies[address.lower()])
+            for address in wallet_addresses if address.lower() in self._proxy_index
+        }
+        rows = health.get_many(list(set(keys.values())))
+        return {address for address, key in keys.items() if key in rows and not is_healthy(rows[key])}
 
-    def auto_assign_proxies(self, wallet_addresses: list) -> tuple:
-        """Automatically assign proxies to wallets in sequence"""
+    def auto_assign_proxies(self, wallet_addresses: list, strategy: str = "round_robin",
+                            health: "ProxyHealth" = None, max_per_proxy: int = None) -> tuple:
+        """Automatically assign proxies to wallets
+        round_robin cycles through the unassigned proxies in sequence.
+        weighted uses latency measured in health to give faster proxies
+        more wallets, at most max_per_proxy each (see weighted_assignment);
+        ValueError is raised, with nothing changed, if that cap leaves too
+        little room for every wallet.
+        Returns tuple of (success_count, failed_count, errors)
+        """
+        if strategy not in ASSIGN_STRATEGIES:
+            raise ValueError(f"Unknown assignment strategy: {strategy}")
+        if max_per_proxy is not None and max_per_proxy < 1:
+            raise ValueError("Max wallets per proxy must be at least 1")
         success_count = 0
         failed_count = 0
         errors = []
         
         # Get all proxy configurations
-        proxies = self._load_proxies()
+        proxies = self._cached_proxies()
         all_proxy_data = []
         
         # First, collect unassigned proxies
@@ -226,14 +311,26 @@ class ProxyStorage:
         if not all_proxy_data:
             return 0, 0, ["No valid proxies available"]
         
+        if strategy == "weighted" and max_per_proxy is not None:
+            # Check before the clean slate below drops any current assignment
+            capacity = max_per_proxy * len({proxy_key(data) for data in all_proxy_data})
+            if capacity < len(wallet_addresses):
+                raise ValueError(f"{len(wallet_addresses)} wallets exceed the capacity of {capacity} "
+                                 f"at {max_per_proxy} wallets per proxy")
+        
+        if strategy == "weighted":
+            health_rows = health.all() if health else {}
+            assignment = weighted_assignment(all_proxy_data, len(wallet_addresses), health_rows, max_per_proxy)
+        else:
+            # Use modulo to cycle through proxies if more wallets than proxies
+            assignment = [all_proxy_data[i % len(all_proxy_data)] for i in range(len(wallet_addresses))]
+        
         # Start with a clean slate - remove all wallet assignments but keep unassigned proxies
         new_proxies = {}
         
         # Assign proxies to wallets in sequence
-        for i, wallet_address in enumerate(wallet_addresses):
+        for wallet_address, proxy_data in zip(wallet_addresses, assignment):
             try:
-                # Use modulo to cycle through proxies if more wallets than proxies
-                proxy_data = all_proxy_data[i % len(all_proxy_data)]
                 # Make a deep copy to avoid reference issues
                 new_proxy_data = {
                     'protocol': proxy_data['protocol'],
@@ -381,7 +478,7 @@ class ProxyStorage:
 
     def get_unassigned_proxies(self) -> list:
         """Get list of proxies not assigned to any wallet"""
-        proxies = self._load_proxies()
+        proxies = self._cached_proxies()
         return [data for key, data in proxies.items() if key.startswith('proxy_')]
 
     def add_proxy(self, proxy_data: dict):
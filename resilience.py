@@ -0,0 +1,326 @@
+import sys
+import time
+import random
+import asyncio
+import threading
+import urllib.parse
+from timeouts import Deadline
+
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 60
+
+class TransientError(Exception):
+    """A failure that may succeed on retry: 5xx, 429, timeout or dropped connection"""
+
+class ProxyError(TransientError):
+    """The proxy refused or dropped the connection"""
+
+class CircuitOpenError(Exception):
+    """A circuit breaker is open; the call was not attempted"""
+
+    def __init__(self, message: str, kind: str = None):
+        super().__init__(message)
+        # "proxy" or "endpoint", for the breaker that refused the call
+        self.kind = kind
+
+def find_error(error: Exception, error_class: type):
+    """Return the first error_class instance in error's cause/context chain, or None
+    Bot methods re-raise failures as plain Exceptions inside their except
+    blocks, so the classified error is still reachable from the context.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, error_class):
+            return error
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return None
+
+def is_proxy_failure(error: Exception) -> bool:
+    """Check whether an error (or its cause) is a proxy failure or an open proxy circuit"""
+    if find_error(error, ProxyError) is not None:
+        return True
+    circuit = find_error(error, CircuitOpenError)
+    return circuit is not None and circuit.kind == "proxy"
+
+def classify_exception(error: Exception):
+    """Map a transport exception to ProxyError/TransientError, or None if not transient"""
+    if isinstance(error, (TransientError, CircuitOpenError)):
+        return error
+    import requests
+    if isinstance(error, requests.exceptions.ProxyError):
+        return ProxyError(str(error))
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return TransientError(str(error))
+    if 'aiohttp' in sys.modules:
+        import aiohttp
+        # A proxy refusing CONNECT (407, 502, ...) is a response error, not a connection error
+        if isinstance(error, (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError)):
+            return ProxyError(str(error))
+        if isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ServerTimeoutError)):
+            return TransientError(str(error) or type(error).__name__)
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return TransientError(str(error) or type(error).__name__)
+    return None
+
+def classify_status(status: int, text: str = ""):
+    """Return a TransientError for retryable HTTP statuses (429, 5xx), else None"""
+    if status == 429 or status >= 500:
+        return TransientError(f"HTTP {status}: {text[:200]}")
+    return None
+
+class RetryPolicy:
+    """Jittered exponential backoff for idempotent calls"""
+
+    def __init__(self, attempts: int = DEFAULT_ATTEMPTS, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY):
+        """Initialize with the total number of attempts and backoff bounds"""
+        if attempts < 1:
+            raise ValueError("Attempts must be at least 1")
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+# Single attempt, for calls that must not be repeated
+NO_RETRY = RetryPolicy(attempts=1)
+DEFAULT_RETRY = RetryPolicy()
+
+class CircuitBreaker:
+    """Stop calling a failing proxy or endpoint for a while
+
+    Opens after failure_threshold consecutive failed calls. While
+    open, calls fail at once with CircuitOpenError. After reset_timeout
+    one trial call is let through; its success closes the breaker, its
+    failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT, kind: str = None):
+        """Initialize a closed breaker; kind ("proxy" or "endpoint") is passed on to CircuitOpenError"""
+        self.name = name
+        self.kind = kind
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    @property
+    def in_trial(self) -> bool:
+        return self._trial
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if not self._trial and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._trial = True
+                return
+            raise CircuitOpenError(f"Circuit open for {self.name}", self.kind)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def check(self):
+        """Raise CircuitOpenError if calls would be refused right now
+        Unlike before_call, this never takes the trial slot.
+        """
+        with self._lock:
+            if self.opened_at is not None and (
+                self._trial or time.monotonic() - self.opened_at < self.reset_timeout
+            ):
+                raise CircuitOpenError(f"Circuit open for {self.name}", self.kind)
+
+    def release_trial(self):
+        """Give back a trial slot that was granted but not used"""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+class BreakerRegistry:
+    """Process-wide circuit breakers, one per proxy and one per endpoint"""
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        """Initialize with settings for breakers created later"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: tuple) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    key, CircuitBreaker(f"{key[0]} {key[1]}", self.failure_threshold, self.reset_timeout, key[0])
+                )
+        return breaker
+
+    def for_proxy(self, proxy_settings: dict):
+        """Return the breaker for a proxy, or None for direct connections"""
+        if not proxy_settings:
+            return None
+        return self._get(("proxy", proxy_settings.get('https') or proxy_settings.get('http')))
+
+    def for_endpoint(self, url: str) -> CircuitBreaker:
+        """Return the breaker for a URL's scheme, host and path"""
+        parts = urllib.parse.urlsplit(url)
+        return self._get(("endpoint", f"{parts.scheme}://{parts.netloc}{parts.path}"))
+
+    def reset(self):
+        """Forget every breaker"""
+        with self._lock:
+            self._breakers.clear()
+
+default_breakers = BreakerRegistry()
+
+class _Attempt:
+    """Breaker bookkeeping shared by the sync and async call loops"""
+
+    def __init__(self, proxy_breaker: CircuitBreaker, endpoint_breaker: CircuitBreaker):
+        self.proxy_breaker = proxy_breaker
+        self.endpoint_breaker = endpoint_breaker
+
+    def before(self):
+        granted = []
+        try:
+            for breaker in (self.proxy_breaker, self.endpoint_breaker):
+                if breaker:
+                    breaker.before_call()
+                    granted.append(breaker)
+        except CircuitOpenError:
+            for breaker in granted:
+                breaker.release_trial()
+            raise
+
+    def success(self):
+        for breaker in (self.proxy_breaker, self.endpoint_breaker):
+            if breaker:
+                breaker.record_success()
+
+    def abandon(self):
+        """Release trial slots for an attempt whose outcome says nothing about health"""
+        for breaker in (self.proxy_breaker, self.endpoint_breaker):
+            if breaker:
+                breaker.release_trial()
+
+    def failure(self, from_status: bool, final: bool = True):
+        # Bad statuses come from the endpoint through a working proxy;
+        # connection trouble is blamed on the proxy when there is one
+        if not self.proxy_breaker or from_status:
+            blamed, spared = self.endpoint_breaker, self.proxy_breaker
+        else:
+            blamed, spared = self.proxy_breaker, self.endpoint_breaker
+        # Only a call's last attempt counts, so one wallet's retries can't
+        # open a breaker the whole fleet shares; a failed trial reopens at once
+        if final or blamed.in_trial:
+            blamed.record_failure()
+        if spared and from_status:
+            spared.record_success()
+        elif spared:
+            spared.release_trial()
+
+def _status_error(result, status_of):
+    if status_of is None:
+        return None
+    status, text = status_of(result)
+    return classify_status(status, text)
+
+def call(func, url: str, proxy_settings: dict = None, policy: RetryPolicy = DEFAULT_RETRY, status_of=None,
+         breakers: BreakerRegistry = None, deadline: Deadline = None):
+    """Call func() through the proxy and endpoint breakers, retrying transient failures
+    status_of(result) returns (status, text) so retryable HTTP statuses
+    are retried too. Pass policy=NO_RETRY for non-idempotent calls.
+    Raises the classified error once attempts run out, or
+    DeadlineExceeded once deadline passes.
+    """
+    breakers = breakers or default_breakers
+    attempt = _Attempt(breakers.for_proxy(proxy_settings), breakers.for_endpoint(url))
+    for number in range(1, policy.attempts + 1):
+        if deadline:
+            deadline.check()
+        attempt.before()
+        cause = None
+        try:
+            result = func()
+            error = _status_error(result, status_of)
+        except Exception as e:
+            if deadline and deadline.expired:
+                # The timeout was cut short by the deadline; not the proxy's fault
+                attempt.abandon()
+                deadline.check()
+            error = classify_exception(e)
+            if error is None:
+                # Not a transport failure; the proxy and endpoint answered
+                attempt.success()
+                raise
+            cause = e
+            attempt.failure(from_status=False, final=number == policy.attempts)
+        else:
+            if error is None:
+                attempt.success()
+                return result
+            attempt.failure(from_status=True, final=number == policy.attempts)
+        if number == policy.attempts:
+            raise error from cause
+        time.sleep(min(policy.delay(number), deadline.remaining()) if deadline else policy.delay(number))
+
+async def call_async(func, url: str, proxy_settings: dict = None, policy: RetryPolicy = DEFAULT_RETRY,
+                     status_of=None, breakers: BreakerRegistry = None, deadline: Deadline = None):
+    """Coroutine version of call(); func is a coroutine function"""
+    breakers = breakers or default_breakers
+    attempt = _Attempt(breakers.for_proxy(proxy_settings), breakers.for_endpoint(url))
+    for number in range(1, policy.attempts + 1):
+        if deadline:
+            deadline.check()
+        attempt.before()
+        cause = None
+        try:
+            result = await func()
+            error = _status_error(result, status_of)
+        except asyncio.CancelledError:
+            attempt.abandon()
+            raise
+        except Exception as e:
+            if deadline and deadline.expired:
+                # The timeout was cut short by the deadline; not the proxy's fault
+                attempt.abandon()
+                deadline.check()
+            error = classify_exception(e)
+            if error is None:
+                # Not a transport failure; the proxy and endpoint answered
+                attempt.success()
+                raise
+            cause = e
+            attempt.failure(from_status=False, final=number == policy.attempts)
+        else:
+            if error is None:
+                attempt.success()
+                return result
+            attempt.failure(from_status=True, final=number == policy.attempts)
+        if number == policy.attempts:
+            raise error from cause
+        await asyncio.sleep(min(policy.delay(number), deadline.remaining()) if deadline else policy.delay(number))
@@ -0,0 +1,126 @@
+import time
+import asyncio
+import threading
+
+# Seconds a response stays fresh, by API path or RPC method. Paths not
+# listed here are never cached.
+DEFAULT_TTLS = {
+    "/user/getUserInfo": 30,
+    "/assignment/totalMiningTime": 30,
+    "/assignment/list": 300,
+    "eth_getBalance": 15,
+}
+
+class _Pending:
+    """A fetch in progress that other callers can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class ResponseCache:
+    """Per-bot cache of API responses with per-endpoint TTLs
+
+    Concurrent identical requests are coalesced: the first caller
+    fetches and the others wait for its result. Only responses accepted
+    by keep() are stored, and invalidate() drops entries after
+    state-changing calls. A fetch that started before an invalidate()
+    is handed to its waiters but not stored.
+    """
+
+    def __init__(self, ttls: dict = None):
+        """Initialize with TTL overrides merged over DEFAULT_TTLS"""
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._entries = {}
+        self._pending = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str):
+        """Return (True, value) for a fresh entry, else (False, None)"""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    def _store(self, key: str, value, generation: int):
+        if generation == self._generation:
+            self._entries[key] = (time.monotonic() + self.ttls[key], value)
+
+    def invalidate(self, *keys: str):
+        """Drop cached entries for keys, or every entry if none are given"""
+        with self._lock:
+            self._generation += 1
+            if not keys:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def get_or_fetch(self, key: str, fetch, keep=None):
+        """Return the cached response for key, or call fetch() to get it
+        keep(response) decides whether a fetched response is cached.
+        """
+        if not self.ttls.get(key):
+            return fetch()
+
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+                generation = self._generation
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        try:
+            pending.result = fetch()
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+                if pending.error is None and (keep is None or keep(pending.result)):
+                    self._store(key, pending.result, generation)
+            pending.event.set()
+        return pending.result
+
+class AsyncResponseCache(ResponseCache):
+    """ResponseCache for AsyncTakerBot; fetch is a coroutine function
+
+    Must be used from a single event loop.
+    """
+
+    async def get_or_fetch(self, key: str, fetch, keep=None):
+        """Return the cached response for key, or await fetch() to get it
+        keep(response) decides whether a fetched response is cached.
+        """
+        if not self.ttls.get(key):
+            return await fetch()
+
+        found, value = self._lookup(key)
+        if found:
+            return value
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._pending[key] = task
+            generation = self._generation
+
+            def done(task):
+                del self._pending[key]
+                if not task.cancelled() and task.exception() is None:
+                    if keep is None or keep(task.result()):
+                        self._store(key, task.result(), generation)
+            task.add_done_callback(done)
+
+        # Shield so one cancelled caller doesn't cancel the shared fetch
+        return await asyncio.shield(task)
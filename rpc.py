@@ -0,0 +1,111 @@
+import requests
+import resilience
+from http_pool import get_session
+from resilience import RetryPolicy, DEFAULT_RETRY, NO_RETRY
+from timeouts import Timeouts, DEFAULT_TIMEOUTS
+
+RPC_URL = "https://rpc-mainnet.taker.xyz/"
+DEFAULT_BATCH_SIZE = 100
+
+def decode_word(data: bytes):
+    """Decode a single 32-byte return value as an int, or None if empty"""
+    if not data:
+        return None
+    return int.from_bytes(data[:32], 'big')
+
+class RpcClient:
+    """Minimal JSON-RPC client for the Taker chain with batch support"""
+
+    def __init__(self, url: str = RPC_URL, proxy_settings: dict = None, session: requests.Session = None,
+                 timeouts: Timeouts = None, retry: RetryPolicy = None):
+        """Initialize client with optional proxy and optional session
+        Without a session, uses the pooled keep-alive session for the proxy.
+        retry is the policy for idempotent calls (default: DEFAULT_RETRY).
+        """
+        self.url = url
+        self.proxy_settings = proxy_settings
+        self.timeouts = timeouts or DEFAULT_TIMEOUTS
+        self.retry = retry or DEFAULT_RETRY
+        self.session = session or get_session(url, proxy_settings)
+        self._next_id = 1
+
+    def _request_id(self) -> int:
+        request_id = self._next_id
+        self._next_id += 1
+        return request_id
+
+    def _post(self, payload, idempotent: bool = True) -> requests.Response:
+        """POST a payload through the proxy and endpoint circuit breakers
+        Idempotent payloads are retried with backoff on transient failures.
+        """
+        return resilience.call(
+            lambda: self.session.post(self.url, json=payload, timeout=self.timeouts.for_requests()),
+            self.url, self.proxy_settings,
+            self.retry if idempotent else NO_RETRY,
+            status_of=lambda response: (response.status_code, response.text)
+        )
+
+    def call(self, method: str, params: list, idempotent: bool = True):
+        """Send a single JSON-RPC call and return its result
+        Pass idempotent=False for calls that must not be resent, such as
+        eth_sendRawTransaction.
+        """
+        payload = {"jsonrpc": "2.0", "id": self._request_id(), "method": method, "params": params}
+        response = self._post(payload, idempotent)
+        if response.status_code != 200:
+            raise Exception(f"RPC {method} failed: {response.text}")
+        data = response.json()
+        if 'error' in data:
+            raise Exception(f"RPC {method} failed: {data['error']}")
+        return data['result']
+
+    def batch(self, calls: list, batch_size: int = DEFAULT_BATCH_SIZE, idempotent: bool = True) -> list:
+        """Send (method, params) calls as JSON-RPC batch arrays
+        Returns one entry per call, in order: the call's result, or an
+        Exception instance if that call failed. A failed HTTP request
+        raises, since none of its calls have results. Pass
+        idempotent=False for batches that must not be resent.
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        results = []
+        for start in range(0, len(calls), batch_size):
+            chunk = calls[start:start + batch_size]
+            payload = [
+                {"jsonrpc": "2.0", "id": self._request_id(), "method": method, "params": params}
+                for method, params in chunk
+            ]
+            response = self._post(payload, idempotent)
+            if response.status_code != 200:
+                raise Exception(f"RPC batch failed: {response.text}")
+            data = response.json()
+            if not isinstance(data, list):
+                # Some nodes answer a rejected batch with a single error object
+                raise Exception(f"RPC batch failed: {data.get('error', data)}")
+
+            # Responses may come back in any order; match them by id
+            by_id = {entry.get('id'): entry for entry in data}
+            for request in payload:
+                entry = by_id.get(request['id'])
+                if entry is None:
+                    results.append(Exception(f"RPC {request['method']} failed: no response"))
+                elif 'error' in entry:
+                    results.append(Exception(f"RPC {request['method']} failed: {entry['error']}"))
+                else:
+                    results.append(entry['result'])
+        return results
+
+    def get_balances(self, addresses: list, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+        """Get balances for many addresses with batched eth_getBalance calls
+        Returns {address: wei}; addresses whose call failed map to None.
+        """
+        calls = [("eth_getBalance", [address, "latest"]) for address in addresses]
+        results = self.batch(calls, batch_size)
+        return {
+            address: None if isinstance(result, Exception) else int(result, 16)
+            for address, result in zip(addresses, results)
+        }
+
+def get_balances(addresses: list, batch_size: int = DEFAULT_BATCH_SIZE, proxy_settings: dict = None) -> dict:
+    """Get {address: wei} for a whole fleet in a handful of HTTP requests"""
+    return RpcClient(proxy_settings=proxy_settings).get_balances(addresses, batch_size)
@@ -0,0 +1,129 @@
+import time
+import heapq
+import threading
+from status_index import StatusIndex, mining_expiry
+
+# Renew this long after a wallet's mining period ends
+DEFAULT_RENEW_MARGIN = 60
+# Try again after this long when a renewal failed or didn't take
+DEFAULT_RETRY_DELAY = 10 * 60
+# The earliest due wallet waits up to this long for later ones, so they are renewed together
+DEFAULT_BATCH_WINDOW = 5 * 60
+DEFAULT_MAX_BATCH = 100
+
+class MiningScheduler:
+    """Renew mining for each wallet only when its 24h period ends
+
+    Keeps a heap of wallets ordered by lastMiningTime + 24h, seeded from
+    the status index, and sleeps until the next batch is due: the
+    wallets due within batch_window of the earliest one are renewed
+    together once the last of them is due, never before. Due wallets
+    are handed to renew(wallets) in batches of at most max_batch; renew
+    must write its outcomes to the status index, which is where the
+    next due time of each wallet is read from.
+    """
+
+    def __init__(self, status_index: StatusIndex, renew, margin: int = DEFAULT_RENEW_MARGIN,
+                 retry_delay: int = DEFAULT_RETRY_DELAY, batch_window: int = DEFAULT_BATCH_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        """Initialize with the status index and a renew([(wallet name, address)]) callable"""
+        self.status_index = status_index
+        self.renew = renew
+        self.margin = margin
+        self.retry_delay = retry_delay
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._heap = []
+        self._due = {}
+        self._wallets = {}
+
+    def schedule(self, wallet_name: str, address: str, due: int):
+        """Schedule (or reschedule) a wallet's next renewal"""
+        self._wallets[address] = (wallet_name, address)
+        self._due[address] = due
+        heapq.heappush(self._heap, (due, address))
+
+    def _next_due(self, row: dict, now: int, renewed: bool = False) -> int:
+        """Return when a wallet with this index row should next be renewed"""
+        if not row or row['last_error']:
+            return now + self.retry_delay if renewed else now
+        due = mining_expiry(row) + self.margin
+        if due <= now:
+            # Not mining: renew now on first sight, otherwise back off
+            return now + self.retry_delay if renewed else now
+        return due
+
+    def seed(self, wallets: list, now: int = None):
+        """Schedule [(wallet name, address)] from their status index rows"""
+        now = now or int(time.time())
+        rows = self.status_index.get_many([address for _, address in wallets])
+        for wallet_name, address in wallets:
+            self.schedule(wallet_name, address, self._next_due(rows.get(address), now))
+
+    def next_due(self):
+        """Return the earliest scheduled renewal time, or None if nothing is scheduled"""
+        while self._heap:
+            due, address = self._heap[0]
+            if self._due.get(address) == due:
+                return due
+            heapq.heappop(self._heap)  # superseded by a reschedule
+        return None
+
+    def next_batch_due(self):
+        """Return when the next batch should run, or None if nothing is scheduled
+        That is the latest due time among the first max_batch wallets
+        due within batch_window of the earliest one.
+        """
+        first = self.next_due()
+        if first is None:
+            return None
+        dues = heapq.nsmallest(self.max_batch, (due for due, address in self._heap if self._due.get(address) == due))
+        return max(due for due in dues if due <= first + self.batch_window)
+
+    def _pop_due(self, now: int) -> list:
+        """Take up to max_batch wallets due by now"""
+        wallets = []
+        while len(wallets) < self.max_batch:
+            due = self.next_due()
+            if due is None or due > now:
+                break
+            _, address = heapq.heappop(self._heap)
+            del self._due[address]
+            wallets.append(self._wallets[address])
+        return wallets
+
+    def run_once(self, now: int = None) -> list:
+        """Renew every wallet that is due and reschedule it
+        Returns the renewed [(wallet name, address)].
+        """
+        now = now or int(time.time())
+        wallets = self._pop_due(now)
+        if not wallets:
+            return []
+        try:
+            self.renew(wallets)
+        except Exception as e:
+            print(f"\nScheduler: renewal failed: {str(e)}")
+
+        now = int(time.time())
+        rows = self.status_index.get_many([address for _, address in wallets])
+        for wallet_name, address in wallets:
+            self.schedule(wallet_name, address, self._next_due(rows.get(address), now, renewed=True))
+        return wallets
+
+    def run(self, stop: threading.Event = None):
+        """Sleep until the next wallet is due, renew, repeat
+        Runs until stop is set or nothing is scheduled.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            due = self.next_batch_due()
+            if due is None:
+                return
+            wait = due - int(time.time())
+            if wait > 0:
+                print(f"\nScheduler: next renewal at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(due))}, "
+                      f"{len(self._due)} wallets scheduled")
+                if stop.wait(wait):
+                    return
+            self.run_once()
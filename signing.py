@@ -0,0 +1,71 @@
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from parallel import map_chunked
+from taker_bot import MINING_CONTRACT, sign_activation_transaction, sign_login_message
+
+def _warm_up():
+    """Import eth_account once per worker process instead of on its first job"""
+    import eth_account  # noqa: F401
+
+def _sign_messages_chunk(items: list) -> list:
+    """Sign (private key, message) pairs"""
+    return [sign_login_message(private_key, message) for private_key, message in items]
+
+def _sign_activations_chunk(items: list) -> list:
+    """Sign (private key, nonce, mining contract) activation transactions"""
+    return [
+        sign_activation_transaction(private_key, nonce, mining_contract)
+        for private_key, nonce, mining_contract in items
+    ]
+
+def sign_activations(items: list, max_workers: int = None) -> list:
+    """Sign many (private key, nonce, mining contract) activation transactions
+    Returns raw transaction bytes in input order.
+    """
+    return map_chunked(_sign_activations_chunk, items, max_workers=max_workers)
+
+class Signer:
+    """Signing stage for the async mining pipeline
+
+    Login nonces and activation transactions are signed in a process
+    pool, so signing throughput scales with cores and the event loop
+    only waits on network I/O. On a single-CPU machine signing runs in
+    the loop's default thread pool instead.
+    """
+
+    def __init__(self, max_workers: int = None):
+        """Initialize with the number of signing processes (default: CPU count)"""
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = None
+
+    def _executor(self):
+        """Return the process pool, started on first use, or None for threads"""
+        if self.max_workers < 2:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_up)
+        return self._pool
+
+    async def _run(self, func, items: list) -> list:
+        return await asyncio.get_running_loop().run_in_executor(self._executor(), func, items)
+
+    async def sign_message(self, private_key: str, message: str) -> str:
+        """Sign a login nonce message, returning the signature hex"""
+        return (await self._run(_sign_messages_chunk, [(private_key, message)]))[0]
+
+    async def sign_activation(self, private_key: str, nonce: int, mining_contract: str = MINING_CONTRACT) -> bytes:
+        """Sign an activation transaction, returning the raw transaction bytes"""
+        return (await self._run(_sign_activations_chunk, [(private_key, nonce, mining_contract)]))[0]
+
+    def close(self):
+        """Shut down the process pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,129 @@
+import time
+import sqlite3
+import threading
+from taker_bot import MINING_PERIOD
+
+INDEX_FILE = "status_index.db"
+# Reported rewards keep growing while a wallet mines; recheck rows this old
+DEFAULT_MAX_AGE = 6 * 60 * 60
+
+COLUMNS = (
+    "wallet",
+    "last_mining_time",
+    "total_mining_time",
+    "total_reward",
+    "reward_amount",
+    "user_id",
+    "invitation_code",
+    "invite_count",
+    "last_checked",
+    "last_error",
+)
+
+class StatusIndex:
+    """Local SQLite index of the last known mining state of each wallet
+
+    Rows are keyed by wallet address. Sweeps write every result, so a
+    report can be answered from the index and only stale rows need the
+    network. The index holds no secrets and is not encrypted.
+    """
+
+    def __init__(self, path: str = INDEX_FILE):
+        """Open (and create if needed) the index database"""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS wallet_status (
+                    wallet TEXT PRIMARY KEY,
+                    last_mining_time INTEGER,
+                    total_mining_time INTEGER,
+                    total_reward REAL,
+                    reward_amount REAL,
+                    user_id TEXT,
+                    invitation_code TEXT,
+                    invite_count INTEGER,
+                    last_checked INTEGER,
+                    last_error TEXT
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS wallet_status_expiry ON wallet_status (last_mining_time)"
+            )
+
+    def get(self, address: str) -> dict:
+        """Return the row for address as a dict, or None"""
+        return self.get_many([address]).get(address)
+
+    def get_many(self, addresses: list) -> dict:
+        """Return {address: row dict} for the addresses that have rows"""
+        rows = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(addresses), 500):
+                chunk = [address.lower() for address in addresses[start:start + 500]]
+                placeholders = ",".join("?" * len(chunk))
+                for row in self._conn.execute(
+                    f"SELECT * FROM wallet_status WHERE wallet IN ({placeholders})", chunk
+                ):
+                    rows[row['wallet']] = dict(row)
+        return {address: rows[address.lower()] for address in addresses if address.lower() in rows}
+
+    def all(self) -> list:
+        """Return every row as a dict"""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute("SELECT * FROM wallet_status")]
+
+    def record_many(self, updates: list):
+        """Upsert (address, {column: value}) pairs in one transaction
+        Only the given columns change; last_checked defaults to now and
+        last_error is cleared unless given.
+        """
+        now = int(time.time())
+        with self._lock, self._conn:
+            for address, fields in updates:
+                fields = {'last_checked': now, 'last_error': None, **fields}
+                unknown = set(fields) - set(COLUMNS)
+                if unknown:
+                    raise ValueError(f"Unknown status columns: {', '.join(sorted(unknown))}")
+                names = ["wallet"] + list(fields)
+                self._conn.execute(
+                    f"INSERT INTO wallet_status ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+                    f"ON CONFLICT(wallet) DO UPDATE SET {', '.join(f'{name}=excluded.{name}' for name in fields)}",
+                    [address.lower()] + list(fields.values())
+                )
+
+    def record(self, address: str, **fields):
+        """Upsert one wallet's row; see record_many"""
+        self.record_many([(address, fields)])
+
+    def record_error(self, address: str, error):
+        """Mark a failed check, keeping the last known state"""
+        self.record(address, last_error=str(error))
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+def mining_expiry(row: dict) -> int:
+    """Timestamp at which a row's mining period ends (0 if never mined)"""
+    if not row or not row['last_mining_time']:
+        return 0
+    return row['last_mining_time'] + MINING_PERIOD
+
+def is_stale(row: dict, now: int = None, max_age: int = DEFAULT_MAX_AGE) -> bool:
+    """Check whether a row must be refreshed from the network
+    Rows are stale when missing, errored, older than max_age (None to
+    ignore age), or when the mining period has ended since the check.
+    """
+    now = now or int(time.time())
+    if not row or row['last_error'] or not row['last_checked']:
+        return True
+    if max_age is not None and now - row['last_checked'] > max_age:
+        return True
+    expiry = mining_expiry(row)
+    return row['last_checked'] < expiry <= now
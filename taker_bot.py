@@ -1,81 +1,277 @@
 import os
 import json
-import requests
 import time
-from web3 import Web3
-from eth_account.messages import encode_defunct
+import asyncio
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
+from accounts import private_key_to_address
+from rpc import decode_word
+from http_pool import get_session
+from nonce_manager import is_nonce_error
+from response_cache import ResponseCache, AsyncResponseCache
+import resilience
+from resilience import DEFAULT_RETRY, NO_RETRY
+from timeouts import Timeouts, Deadline, DEFAULT_TIMEOUTS
 
-class TakerBot:
-    def __init__(self, private_key: str, proxy_settings: dict = None):
-        """Initialize TakerBot with credentials and optional proxy"""
+MINING_CONTRACT = "0xB3eFE5105b835E5Dd9D206445Dbd66DF24b912AB"
+# Selector of the mining contract's active() function
+ACTIVATE_MINING_SELECTOR = "0x02fb0c5e"
+
+# JSON-RPC requests go to a different host than the API and get no API headers
+RPC_HEADERS = {'Content-Type': 'application/json'}
+# check_mining_status default: no batched chain read was passed in
+NOT_READ = object()
+# Seconds between eth_getTransactionReceipt polls in AsyncTakerBot
+RECEIPT_POLL_INTERVAL = 2
+
+# Mining stays active for this long after lastMiningTime
+MINING_PERIOD = 24 * 60 * 60
+
+# web3, eth_account and aiohttp take seconds to import; they are imported on first use
+if TYPE_CHECKING:
+    import aiohttp
+    from token_cache import TokenCache
+    from nonce_manager import NonceManager
+
+def build_activation_transaction(nonce: int, mining_contract: str = MINING_CONTRACT) -> dict:
+    """Build the mining activation transaction for the given nonce"""
+    return {
+        'nonce': nonce,
+        'gasPrice': 1000000,  # 0xf4240 from the example
+        'gas': 73000,  # 0x11d19 from the example
+        'to': mining_contract,
+        'value': 0,
+        'data': ACTIVATE_MINING_SELECTOR,  # Function signature for activating mining
+        'chainId': 1125  # 0x465 Taker chain ID
+    }
+
+def sign_activation_transaction(private_key: str, nonce: int, mining_contract: str = MINING_CONTRACT) -> bytes:
+    """Sign the mining activation transaction and return the raw transaction bytes"""
+    from eth_account import Account
+    signed_txn = Account.sign_transaction(build_activation_transaction(nonce, mining_contract), private_key)
+    return bytes(signed_txn.rawTransaction)
+
+def sign_login_message(private_key: str, message: str) -> str:
+    """Sign a login nonce message and return the signature hex"""
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+    signed_message = Account.sign_message(encode_defunct(text=message), private_key=private_key)
+    return signed_message.signature.hex()
+
+class MiningStatus:
+    """Mining state of one wallet, as returned by check_mining_status
+
+    Combines the decoded result of the active() eth_call with the API's
+    lastMiningTime/totalMiningTime, so callers don't need to fetch
+    get_total_mining_time again. Truthy when mining is active.
+    """
+
+    def __init__(self, last_mining_time: int, total_mining_time: int, chain_result: int = None,
+                 chain_error: str = None, checked_at: int = None):
+        """Initialize from API mining times and the decoded eth_call result"""
+        self.last_mining_time = last_mining_time or 0
+        self.total_mining_time = total_mining_time or 0
+        self.chain_result = chain_result
+        self.chain_error = chain_error
+        self.checked_at = checked_at or int(time.time())
+
+    @classmethod
+    def from_responses(cls, rpc_response: dict, mining_time: dict) -> "MiningStatus":
+        """Build from the eth_call JSON-RPC response and the totalMiningTime response"""
+        chain_result = chain_error = None
+        if 'error' in rpc_response:
+            chain_error = str(rpc_response['error'].get('message', rpc_response['error']))
+        elif rpc_response.get('result'):
+            chain_result = decode_word(bytes.fromhex(rpc_response['result'][2:]))
+        return cls(
+            mining_time['data']['lastMiningTime'],
+            mining_time['data']['totalMiningTime'],
+            chain_result,
+            chain_error
+        )
+
+    @property
+    def is_active(self) -> bool:
+        """Mining is active if last mining time is within 24 hours"""
+        return (self.checked_at - self.last_mining_time) < MINING_PERIOD
+
+    @property
+    def time_left(self) -> int:
+        """Seconds until mining can be renewed (may be negative)"""
+        return (self.last_mining_time + MINING_PERIOD) - int(time.time())
+
+    def __bool__(self) -> bool:
+        return self.is_active
+
+    def __repr__(self) -> str:
+        return (f"MiningStatus(active={self.is_active}, last_mining_time={self.last_mining_time}, "
+                f"total_mining_time={self.total_mining_time}, chain_result={self.chain_result})")
+
+class TakerBotBase:
+    """State and helpers shared by TakerBot and AsyncTakerBot"""
+
+    def __init__(self, private_key: str, proxy_settings: dict = None, token_cache: "TokenCache" = None,
+                 nonce_manager: "NonceManager" = None, timeouts: Timeouts = None, deadline: Deadline = None):
+        """Initialize credentials, API headers and per-call limits"""
         self.base_url = "https://lightmining-api.taker.xyz"
-        
-        # Configure Web3 with proxy if provided
-        if proxy_settings:
-            provider_url = "https://rpc-mainnet.taker.xyz/"
-            session = requests.Session()
-            session.proxies = proxy_settings
-            self.web3 = Web3(Web3.HTTPProvider(provider_url, session=session))
-        else:
-            self.web3 = Web3(Web3.HTTPProvider("https://rpc-mainnet.taker.xyz/"))
-            
+        self.rpc_url = "https://rpc-mainnet.taker.xyz/"
+        self.proxy_settings = proxy_settings
+
         self.private_key = private_key.replace('0x', '')
         self.wallet_address = self._get_address()
-        
-        # Configure session with proxy if provided
-        self.session = requests.Session()
-        if proxy_settings:
-            self.session.proxies = proxy_settings
-            
-        self.session.headers.update({
+
+        # API headers; they carry the bearer token, so never send them to the RPC host
+        self.headers = {
             'Accept': 'application/json, text/plain, */*',
             'Accept-Language': 'id,en-US;q=0.9,en;q=0.8',
             'Content-Type': 'application/json',
             'Origin': 'https://earn.taker.xyz',
             'Referer': 'https://earn.taker.xyz/',
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        }
         self.token = None
-        self.mining_contract = "0xB3eFE5105b835E5Dd9D206445Dbd66DF24b912AB"
+        self.token_cache = token_cache
+        self.nonce_manager = nonce_manager
+        self.timeouts = timeouts or DEFAULT_TIMEOUTS
+        self.deadline = deadline
+        self.mining_contract = MINING_CONTRACT
         self.multicall_contract = "0x499f9C7A4aa2c660931dB3bfcd092194F492a92f"
-        
+
     def _get_address(self) -> str:
         """Get wallet address from private key"""
-        account = self.web3.eth.account.from_key(self.private_key)
-        return account.address
+        return private_key_to_address(self.private_key)
+
+    def _check_deadline(self, what: str):
+        """Raise DeadlineExceeded if the bot's deadline has passed"""
+        if self.deadline:
+            self.deadline.check(what)
 
+    def sign_message(self, message):
+        """Sign message with wallet private key"""
+        return sign_login_message(self.private_key, message)
+
+    def _set_token(self, token: str):
+        """Use token for authenticated API calls"""
+        self.token = token
+        self.headers['Authorization'] = f'Bearer {self.token}'
+
+    def use_cached_token(self, force: bool = False) -> bool:
+        """Authenticate with an unexpired cached token if there is one
+        With force, the cached token is dropped instead.
+        """
+        if not self.token_cache:
+            return False
+        if force:
+            self.token_cache.invalidate(self.wallet_address)
+            return False
+        token = self.token_cache.get(self.wallet_address)
+        if not token:
+            return False
+        self._set_token(token)
+        return True
+
+class TakerBot(TakerBotBase):
+    def __init__(self, private_key: str, proxy_settings: dict = None, token_cache: "TokenCache" = None,
+                 nonce_manager: "NonceManager" = None, timeouts: Timeouts = None, deadline: Deadline = None):
+        """Initialize TakerBot with credentials, optional proxy, token cache and nonce manager
+        timeouts bounds each call; deadline, if given, bounds all of them together.
+        """
+        super().__init__(private_key, proxy_settings, token_cache, nonce_manager, timeouts, deadline)
+        self._web3 = None
+        # Pooled keep-alive sessions shared with other bots on the same proxy;
+        # per-bot headers are sent with each request
+        self.session = get_session(self.base_url, proxy_settings)
+        self.rpc_session = get_session(self.rpc_url, proxy_settings)
+        self.response_cache = ResponseCache()
+
+    @property
+    def web3(self):
+        """Web3 client, created on first use"""
+        if self._web3 is None:
+            from web3 import Web3
+            # web3 keeps one keep-alive session per endpoint and thread, so the
+            # proxy is passed per request rather than on a session of our own
+            request_kwargs = {'timeout': self.timeouts.for_requests()}
+            if self.proxy_settings:
+                request_kwargs['proxies'] = self.proxy_settings
+            self._web3 = Web3(Web3.HTTPProvider(self.rpc_url, request_kwargs=request_kwargs))
+        return self._web3
+        
     def generate_nonce(self):
         """Generate nonce for wallet signing"""
         payload = {"walletAddress": self.wallet_address}
-        response = self.session.post(f"{self.base_url}/wallet/generateNonce", json=payload)
+        response = self._request("POST", f"{self.base_url}/wallet/generateNonce", json=payload)
         if response.status_code == 200:
             return response.json()['data']['nonce']
         raise Exception(f"Failed to generate nonce: {response.text}")
 
-    def sign_message(self, message):
-        """Sign message with wallet private key"""
-        message_hash = encode_defunct(text=message)
-        signed_message = self.web3.eth.account.sign_message(message_hash, private_key=self.private_key)
-        return signed_message.signature.hex()
-        
-    def login(self) -> dict:
-        """Login to Taker Protocol"""
+    def _request(self, method: str, url: str, idempotent: bool = True, **kwargs):
+        """Send an HTTP request through the proxy and endpoint circuit breakers
+        Idempotent requests are retried with backoff on transient failures.
+        """
+        return resilience.call(
+            lambda: self.session.request(method, url, headers=self.headers,
+                                         timeout=self.timeouts.for_requests(self.deadline), **kwargs),
+            url, self.proxy_settings, DEFAULT_RETRY if idempotent else NO_RETRY,
+            status_of=lambda response: (response.status_code, response.text), deadline=self.deadline
+        )
+
+    def _rpc_post(self, payload: dict):
+        """POST a read-only JSON-RPC payload through the breakers, with retries"""
+        return resilience.call(
+            lambda: self.rpc_session.post(self.rpc_url, json=payload,
+                                          timeout=self.timeouts.for_requests(self.deadline)),
+            self.rpc_url, self.proxy_settings,
+            status_of=lambda response: (response.status_code, response.text), deadline=self.deadline
+        )
+
+    def _api_request(self, method: str, path: str, **kwargs):
+        """Send an API request, logging in again once if the token was rejected
+        Successful reads of cacheable paths are served from response_cache.
+        Reads (GETs and bodyless POSTs) are retried on transient failures.
+        """
+        url = f"{self.base_url}{path}"
+        idempotent = method == "GET" or not kwargs
+
+        def fetch():
+            response = self._request(method, url, idempotent, **kwargs)
+            if response.status_code == 401 and self.token:
+                self.login(force=True)
+                response = self._request(method, url, idempotent, **kwargs)
+            return response
+
+        if kwargs:
+            return fetch()
+        return self.response_cache.get_or_fetch(path, fetch, keep=lambda response: response.status_code == 200)
+
+    def login(self, force: bool = False) -> dict:
+        """Login to Taker Protocol
+        Reuses an unexpired token from the token cache unless force is set.
+        """
+        if self.use_cached_token(force):
+            return {'data': {'token': self.token}, 'cached': True}
         try:
             nonce = self.generate_nonce()
             signature = self.sign_message(nonce)
-            
+        except Exception as e:
+            raise Exception(f"Login failed: {str(e)}")
+        return self.complete_login(nonce, signature)
+
+    def complete_login(self, nonce: str, signature: str) -> dict:
+        """Exchange a signed login nonce for a bearer token"""
+        try:
             payload = {
                 "address": self.wallet_address,
                 "signature": signature,
                 "message": nonce
             }
             
-            response = self.session.post(f"{self.base_url}/wallet/login", json=payload)
+            response = self._request("POST", f"{self.base_url}/wallet/login", idempotent=False, json=payload)
             if response.status_code == 200:
                 data = response.json()
-                self.token = data['data']['token']
-                self.session.headers.update({'Authorization': f'Bearer {self.token}'})
+                self._set_token(data['data']['token'])
+                if self.token_cache:
+                    self.token_cache.set(self.wallet_address, self.token)
                 return data
             raise Exception(f"Login failed: {response.text}")
         except Exception as e:
@@ -84,7 +280,7 @@ class TakerBot:
     def get_user_info(self) -> dict:
         """Get user information"""
         try:
-            response = self.session.get(f"{self.base_url}/user/getUserInfo")
+            response = self._api_request("GET", "/user/getUserInfo")
             if response.status_code == 200:
                 return response.json()
             raise Exception(f"Failed to get user info: {response.text}")
@@ -94,7 +290,7 @@ class TakerBot:
     def get_total_mining_time(self) -> dict:
         """Get total mining time"""
         try:
-            response = self.session.get(f"{self.base_url}/assignment/totalMiningTime")
+            response = self._api_request("GET", "/assignment/totalMiningTime")
             if response.status_code == 200:
                 return response.json()
             raise Exception(f"Failed to get mining time: {response.text}")
@@ -104,7 +300,7 @@ class TakerBot:
     def get_assignment_list(self) -> dict:
         """Get list of available assignments"""
         try:
-            response = self.session.post(f"{self.base_url}/assignment/list")
+            response = self._api_request("POST", "/assignment/list")
             if response.status_code == 200:
                 return response.json()
             raise Exception(f"Failed to get assignments: {response.text}")
@@ -120,15 +316,21 @@ class TakerBot:
                 "method": "eth_getBalance",
                 "params": [self.wallet_address, "latest"]
             }
-            response = requests.post("https://rpc-mainnet.taker.xyz/", json=payload)
+            response = self.response_cache.get_or_fetch(
+                "eth_getBalance", lambda: self._rpc_post(payload),
+                keep=lambda response: response.status_code == 200
+            )
             if response.status_code == 200:
                 return response.json()
             raise Exception(f"Failed to get balance: {response.text}")
         except Exception as e:
             raise Exception(f"Failed to get balance: {str(e)}")
 
-    def check_mining_status(self) -> bool:
-        """Check if mining is active"""
+    def check_mining_status(self) -> MiningStatus:
+        """Check if mining is active
+        Returns a MiningStatus, which is truthy while mining is active and
+        carries the mining times so callers needn't fetch them again.
+        """
         try:
             # Step 1: Check mining status via eth_call
             payload = {
@@ -136,71 +338,414 @@ class TakerBot:
                 "id": 6,
                 "method": "eth_call",
                 "params": [{
-                    "data": "0x02fb0c5e",
+                    "data": ACTIVATE_MINING_SELECTOR,
                     "from": self.wallet_address,
                     "to": self.mining_contract
                 }, "latest"]
             }
-            response = requests.post("https://rpc-mainnet.taker.xyz/", json=payload)
+            response = self._rpc_post(payload)
             if response.status_code != 200:
                 raise Exception("Failed to check mining status")
 
-            # Also check API status
+            # Step 2: Combine with API mining times
             mining_time = self.get_total_mining_time()
-            last_mining_time = mining_time['data']['lastMiningTime']
-            current_time = int(time.time())
-            
-            # Mining is active if last mining time is within 24 hours
-            return (current_time - last_mining_time) < 24 * 60 * 60
+            return MiningStatus.from_responses(response.json(), mining_time)
 
         except Exception as e:
             raise Exception(f"Failed to check mining status: {str(e)}")
 
+    def next_nonce(self) -> int:
+        """Return the nonce for the next transaction
+        Comes from the nonce manager when set, otherwise from the chain.
+        """
+        self._check_deadline("nonce lookup")
+        if self.nonce_manager:
+            return self.nonce_manager.next_nonce(self.wallet_address)
+        return self.web3.eth.get_transaction_count(self.wallet_address)
+
+    def submit_mining_transaction(self, raw_transaction: bytes = None, nonce: int = None):
+        """Sign and broadcast the mining activation transaction, returning its hash
+        raw_transaction and nonce may come pre-signed from a signing stage.
+        """
+        for attempt in range(2):
+            if raw_transaction is None:
+                nonce = self.next_nonce()
+                raw_transaction = sign_activation_transaction(self.private_key, nonce, self.mining_contract)
+            self._check_deadline("transaction submit")
+            try:
+                tx_hash = self.web3.eth.send_raw_transaction(raw_transaction)
+                self.response_cache.invalidate("eth_getBalance")
+                break
+            except Exception as e:
+                if not self.nonce_manager:
+                    raise
+                # Locally tracked nonce; resync and re-sign once if the node disagrees
+                if attempt == 0 and is_nonce_error(e):
+                    self.nonce_manager.resync([self.wallet_address])
+                    raw_transaction = None
+                    continue
+                if nonce is not None:
+                    self.nonce_manager.release(self.wallet_address, nonce)
+                raise
+        print(f"Transaction sent: {tx_hash.hex()}")
+        return tx_hash
+
+    def wait_for_mining_receipt(self, tx_hash):
+        """Wait for the activation transaction to be mined and check it succeeded"""
+        timeout = self.timeouts.for_receipt(self.deadline)
+        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+        if receipt['status'] != 1:
+            raise Exception("Transaction failed")
+        return receipt
+
+    def start_mining(self) -> bool:
+        """Start mining on the API once the activation transaction is confirmed"""
+        payload = {"status": False}
+        response = self._api_request("POST", "/assignment/startMining", json=payload)
+        # Mining times, rewards and assignments change once mining starts
+        self.response_cache.invalidate()
+        if response.status_code != 200:
+            raise Exception("Failed to start mining on API")
+
+        # Verify mining started
+        mining_time = self.get_total_mining_time()
+        if not mining_time['data']['lastMiningTime']:
+            raise Exception("Mining did not start properly")
+
+        return True
+
     def activate_mining(self) -> bool:
         """Activate mining process"""
         try:
-            # Step 1: Build transaction
-            nonce = self.web3.eth.get_transaction_count(self.wallet_address)
-            transaction = {
-                'nonce': nonce,
-                'gasPrice': 1000000,  # 0xf4240 from the example
-                'gas': 73000,  # 0x11d19 from the example
-                'to': self.mining_contract,
-                'value': 0,
-                'data': '0x02fb0c5e',  # Function signature for activating mining
-                'chainId': 1125  # 0x465 Taker chain ID
+            tx_hash = self.submit_mining_transaction()
+            self.wait_for_mining_receipt(tx_hash)
+            return self.start_mining()
+        except Exception as e:
+            raise Exception(f"Failed to activate mining: {str(e)}")
+
+class AsyncTakerBot(TakerBotBase):
+    """Asyncio counterpart of TakerBot
+
+    Exposes the same methods as TakerBot as coroutines. Pass a shared
+    aiohttp.ClientSession to drive many bots over one connection pool.
+    aiohttp only speaks HTTP proxies, so a bot with a SOCKS proxy opens
+    its own session through aiohttp-socks instead; close() it when done.
+    Chain calls are plain JSON-RPC over the same session, so they take
+    the same proxy.
+    """
+
+    def __init__(self, private_key: str, proxy_settings: dict = None, session: "aiohttp.ClientSession" = None,
+                 token_cache: "TokenCache" = None, nonce_manager: "NonceManager" = None,
+                 timeouts: Timeouts = None, deadline: Deadline = None):
+        """Initialize AsyncTakerBot with credentials, optional proxy, shared session and token cache
+        timeouts bounds each call; deadline, if given, bounds all of them together.
+        """
+        super().__init__(private_key, proxy_settings, token_cache, nonce_manager, timeouts, deadline)
+        # aiohttp takes an HTTP proxy per request rather than per session
+        self.proxy = proxy_settings.get('https') or proxy_settings.get('http') if proxy_settings else None
+        self._socks_proxy = None
+        if self.proxy and self.proxy.startswith('socks'):
+            self._socks_proxy, self.proxy, session = self.proxy, None, None
+        self._session = session
+        self._owns_session = session is None
+        self.response_cache = AsyncResponseCache()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close the HTTP session if this bot created it"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Return the HTTP session, creating one on first use"""
+        if self._session is None or self._session.closed:
+            import aiohttp
+            connector = None
+            if self._socks_proxy:
+                try:
+                    from aiohttp_socks import ProxyConnector
+                except ImportError:
+                    raise Exception("SOCKS proxies need the aiohttp-socks package (pip install aiohttp-socks)")
+                connector = ProxyConnector.from_url(self._socks_proxy)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._owns_session = True
+        return self._session
+
+    async def _post(self, url: str, payload: dict = None, headers: dict = None):
+        """POST JSON with the API headers (or headers) and return (status, body text)"""
+        async with self._get_session().post(url, json=payload, headers=headers or self.headers, proxy=self.proxy,
+                                            timeout=self.timeouts.for_aiohttp(self.deadline)) as response:
+            return response.status, await response.text()
+
+    async def _get(self, url: str):
+        """GET and return (status, body text)"""
+        async with self._get_session().get(url, headers=self.headers, proxy=self.proxy,
+                                           timeout=self.timeouts.for_aiohttp(self.deadline)) as response:
+            return response.status, await response.text()
+
+    async def _send(self, method: str, url: str, payload: dict = None, idempotent: bool = True,
+                    headers: dict = None):
+        """Send a GET or POST through the circuit breakers and return (status, body text)
+        Idempotent requests are retried with backoff on transient failures.
+        """
+        async def send():
+            if method == "GET":
+                return await self._get(url)
+            return await self._post(url, payload, headers)
+
+        return await resilience.call_async(send, url, self.proxy_settings,
+                                           DEFAULT_RETRY if idempotent else NO_RETRY,
+                                           status_of=lambda response: response, deadline=self.deadline)
+
+    async def _rpc_post(self, payload: dict, idempotent: bool = True):
+        """POST a JSON-RPC payload without the API headers
+        Idempotent payloads are retried on transient failures.
+        """
+        return await self._send("POST", self.rpc_url, payload, idempotent, RPC_HEADERS)
+
+    async def _rpc_call(self, method: str, params: list, idempotent: bool = True):
+        """Send a single JSON-RPC call and return its result"""
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        status, text = await self._rpc_post(payload, idempotent)
+        if status != 200:
+            raise Exception(f"RPC {method} failed: {text}")
+        data = json.loads(text)
+        if 'error' in data:
+            raise Exception(f"RPC {method} failed: {data['error']}")
+        return data['result']
+
+    async def _api_request(self, method: str, path: str, payload: dict = None):
+        """Send an API request, logging in again once if the token was rejected
+        Successful reads of cacheable paths are served from response_cache.
+
+        Reads (GETs and bodyless POSTs) are retried on transient failures.
+        """
+        url = f"{self.base_url}{path}"
+        idempotent = method == "GET" or payload is None
+
+        async def fetch():
+            status, text = await self._send(method, url, payload, idempotent)
+            if status == 401 and self.token:
+                await self.login(force=True)
+                status, text = await self._send(method, url, payload, idempotent)
+            return status, text
+
+        if payload is not None:
+            return await fetch()
+        return await self.response_cache.get_or_fetch(path, fetch, keep=lambda response: response[0] == 200)
+
+    async def generate_nonce(self):
+        """Generate nonce for wallet signing"""
+        payload = {"walletAddress": self.wallet_address}
+        status, text = await self._send("POST", f"{self.base_url}/wallet/generateNonce", payload)
+        if status == 200:
+            return json.loads(text)['data']['nonce']
+        raise Exception(f"Failed to generate nonce: {text}")
+
+    async def login(self, force: bool = False) -> dict:
+        """Login to Taker Protocol
+        Reuses an unexpired token from the token cache unless force is set.
+        """
+        if self.use_cached_token(force):
+            return {'data': {'token': self.token}, 'cached': True}
+        try:
+            nonce = await self.generate_nonce()
+            signature = self.sign_message(nonce)
+        except Exception as e:
+            raise Exception(f"Login failed: {str(e)}")
+        return await self.complete_login(nonce, signature)
+
+    async def complete_login(self, nonce: str, signature: str) -> dict:
+        """Exchange a signed login nonce for a bearer token"""
+        try:
+            payload = {
+                "address": self.wallet_address,
+                "signature": signature,
+                "message": nonce
             }
 
-            # Sign and send transaction
-            signed_txn = self.web3.eth.account.sign_transaction(transaction, self.private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            print(f"Transaction sent: {tx_hash.hex()}")
-            
-            # Wait for transaction confirmation
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-            if receipt['status'] != 1:
-                raise Exception("Transaction failed")
+            status, text = await self._send("POST", f"{self.base_url}/wallet/login", payload, idempotent=False)
+            if status == 200:
+                data = json.loads(text)
+                self._set_token(data['data']['token'])
+                if self.token_cache:
+                    self.token_cache.set(self.wallet_address, self.token)
+                return data
+            raise Exception(f"Login failed: {text}")
+        except Exception as e:
+            raise Exception(f"Login failed: {str(e)}")
 
-            # Step 2: Get block number
-            block_number = self.web3.eth.block_number
+    async def get_user_info(self) -> dict:
+        """Get user information"""
+        try:
+            status, text = await self._api_request("GET", "/user/getUserInfo")
+            if status == 200:
+                return json.loads(text)
+            raise Exception(f"Failed to get user info: {text}")
+        except Exception as e:
+            raise Exception(f"Failed to get user info: {str(e)}")
 
-            # Step 3: Get transaction details
-            tx_details = self.web3.eth.get_transaction(tx_hash)
-            tx_receipt = self.web3.eth.get_transaction_receipt(tx_hash)
+    async def get_total_mining_time(self) -> dict:
+        """Get total mining time"""
+        try:
+            status, text = await self._api_request("GET", "/assignment/totalMiningTime")
+            if status == 200:
+                return json.loads(text)
+            raise Exception(f"Failed to get mining time: {text}")
+        except Exception as e:
+            raise Exception(f"Failed to get mining time: {str(e)}")
 
-            # Step 4: Start mining via API
-            payload = {"status": False}
-            response = self.session.post(f"{self.base_url}/assignment/startMining", json=payload)
-            if response.status_code != 200:
-                raise Exception("Failed to start mining on API")
+    async def get_assignment_list(self) -> dict:
+        """Get list of available assignments"""
+        try:
+            status, text = await self._api_request("POST", "/assignment/list")
+            if status == 200:
+                return json.loads(text)
+            raise Exception(f"Failed to get assignments: {text}")
+        except Exception as e:
+            raise Exception(f"Failed to get assignments: {str(e)}")
 
-            # Step 5: Verify mining started
-            mining_time = self.get_total_mining_time()
-            if not mining_time['data']['lastMiningTime']:
-                raise Exception("Mining did not start properly")
+    async def get_balance(self) -> dict:
+        """Get wallet balance"""
+        try:
+            payload = {
+                "jsonrpc": "2.0",
+                "id": 11,
+                "method": "eth_getBalance",
+                "params": [self.wallet_address, "latest"]
+            }
+            status, text = await self.response_cache.get_or_fetch(
+                "eth_getBalance", lambda: self._rpc_post(payload),
+                keep=lambda response: response[0] == 200
+            )
+            if status == 200:
+                return json.loads(text)
+            raise Exception(f"Failed to get balance: {text}")
+        except Exception as e:
+            raise Exception(f"Failed to get balance: {str(e)}")
+
+    async def check_mining_status(self, chain_state=NOT_READ) -> MiningStatus:
+        """Check if mining is active
+        Returns a MiningStatus, which is truthy while mining is active and
+        carries the mining times so callers needn't fetch them again.
+        chain_state is this wallet's entry from a batched read_mining_states;
+        when given, the per-wallet eth_call is skipped.
+        """
+        try:
+            if chain_state is not NOT_READ:
+                mining_time = await self.get_total_mining_time()
+                if isinstance(chain_state, Exception):
+                    return MiningStatus(mining_time['data']['lastMiningTime'], mining_time['data']['totalMiningTime'],
+                                        chain_error=str(chain_state))
+                return MiningStatus(mining_time['data']['lastMiningTime'], mining_time['data']['totalMiningTime'],
+                                    chain_state)
+
+            # Step 1: Check mining status via eth_call
+            payload = {
+                "jsonrpc": "2.0",
+                "id": 6,
+                "method": "eth_call",
+                "params": [{
+                    "data": ACTIVATE_MINING_SELECTOR,
+                    "from": self.wallet_address,
+                    "to": self.mining_contract
+                }, "latest"]
+            }
+            status, text = await self._rpc_post(payload)
+            if status != 200:
+                raise Exception("Failed to check mining status")
+
+            # Step 2: Combine with API mining times
+            mining_time = await self.get_total_mining_time()
+            return MiningStatus.from_responses(json.loads(text), mining_time)
 
-            return True
+        except Exception as e:
+            raise Exception(f"Failed to check mining status: {str(e)}")
 
+    async def next_nonce(self) -> int:
+        """Return the nonce for the next transaction
+        Comes from the nonce manager when set, otherwise from the chain.
+        """
+        self._check_deadline("nonce lookup")
+        if self.nonce_manager:
+            # The manager is synchronous, so its network work runs off the event loop
+            return await asyncio.to_thread(self.nonce_manager.next_nonce, self.wallet_address)
+        return int(await self._rpc_call("eth_getTransactionCount", [self.wallet_address, "latest"]), 16)
+
+    async def submit_mining_transaction(self, raw_transaction: bytes = None, nonce: int = None):
+        """Sign and broadcast the mining activation transaction, returning its hash
+        raw_transaction and nonce may come pre-signed from a signing stage.
+        """
+        for attempt in range(2):
+            if raw_transaction is None:
+                nonce = await self.next_nonce()
+                raw_transaction = sign_activation_transaction(self.private_key, nonce, self.mining_contract)
+            self._check_deadline("transaction submit")
+            raw_hex = raw_transaction.hex()
+            try:
+                tx_hash = await self._rpc_call(
+                    "eth_sendRawTransaction", [raw_hex if raw_hex.startswith('0x') else '0x' + raw_hex],
+                    idempotent=False
+                )
+                self.response_cache.invalidate("eth_getBalance")
+                break
+            except Exception as e:
+                if not self.nonce_manager:
+                    raise
+                # Locally tracked nonce; resync and re-sign once if the node disagrees
+                if attempt == 0 and is_nonce_error(e):
+                    await asyncio.to_thread(self.nonce_manager.resync, [self.wallet_address])
+                    raw_transaction = None
+                    continue
+                if nonce is not None:
+                    self.nonce_manager.release(self.wallet_address, nonce)
+                raise
+        print(f"Transaction sent: {tx_hash}")
+        return tx_hash
+
+    async def wait_for_mining_receipt(self, tx_hash: str):
+        """Wait for the activation transaction to be mined and check it succeeded"""
+        timeout = self.timeouts.for_receipt(self.deadline)
+        waited = 0
+        while True:
+            receipt = await self._rpc_call("eth_getTransactionReceipt", [tx_hash])
+            if receipt:
+                break
+            if waited >= timeout:
+                raise Exception(f"Transaction {tx_hash} not mined after {timeout:g} seconds")
+            await asyncio.sleep(RECEIPT_POLL_INTERVAL)
+            waited += RECEIPT_POLL_INTERVAL
+        if int(receipt['status'], 16) != 1:
+            raise Exception("Transaction failed")
+        return receipt
+
+    async def start_mining(self) -> bool:
+        """Start mining on the API once the activation transaction is confirmed"""
+        status, _ = await self._api_request("POST", "/assignment/startMining", {"status": False})
+        # Mining times, rewards and assignments change once mining starts
+        self.response_cache.invalidate()
+        if status != 200:
+            raise Exception("Failed to start mining on API")
+
+        # Verify mining started
+        mining_time = await self.get_total_mining_time()
+        if not mining_time['data']['lastMiningTime']:
+            raise Exception("Mining did not start properly")
+
+        return True
+
+    async def activate_mining(self) -> bool:
+        """Activate mining process"""
+        try:
+            tx_hash = await self.submit_mining_transaction()
+            await self.wait_for_mining_receipt(tx_hash)
+            return await self.start_mining()
         except Exception as e:
             raise Exception(f"Failed to activate mining: {str(e)}")
 
@@ -0,0 +1,77 @@
+import time
+
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 30
+DEFAULT_RECEIPT_TIMEOUT = 180
+# Budget for one wallet from login through status check and activation
+DEFAULT_WALLET_DEADLINE = 600
+
+class DeadlineExceeded(Exception):
+    """A wallet ran out of its overall time budget
+
+    Deliberately not a TimeoutError, so it is never retried as a
+    transient failure.
+    """
+
+class Deadline:
+    """Wall-clock budget shared by every call made for one wallet"""
+
+    def __init__(self, seconds: float):
+        """Start a deadline that expires seconds from now"""
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left, never negative"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, what: str = None):
+        """Raise DeadlineExceeded if the deadline has passed"""
+        if self.expired:
+            suffix = f" during {what}" if what else ""
+            raise DeadlineExceeded(f"Deadline of {self.seconds:g}s exceeded{suffix}")
+
+    def clamp(self, timeout: float) -> float:
+        """Shorten timeout so it ends no later than the deadline"""
+        self.check()
+        return min(timeout, self.remaining()) if timeout else self.remaining()
+
+class Timeouts:
+    """Per-call timeouts for API, RPC and receipt waits
+
+    With a Deadline, every timeout is cut short so no single call can
+    outlive the wallet's overall budget.
+    """
+
+    def __init__(self, connect: float = DEFAULT_CONNECT_TIMEOUT, read: float = DEFAULT_READ_TIMEOUT,
+                 receipt: float = DEFAULT_RECEIPT_TIMEOUT):
+        """Initialize with connect, read and receipt wait timeouts in seconds"""
+        self.connect = connect
+        self.read = read
+        self.receipt = receipt
+
+    def for_requests(self, deadline: Deadline = None) -> tuple:
+        """(connect, read) timeout tuple for requests"""
+        if deadline is None:
+            return self.connect, self.read
+        return deadline.clamp(self.connect), deadline.clamp(self.read)
+
+    def for_aiohttp(self, deadline: Deadline = None):
+        """aiohttp.ClientTimeout for one request
+        The connect timeout applies to the socket only; aiohttp's own
+        connect timeout also counts time queued for a pooled connection,
+        which says nothing about the proxy.
+        """
+        import aiohttp
+        total = deadline.clamp(None) if deadline else None
+        return aiohttp.ClientTimeout(total=total, sock_connect=self.connect, sock_read=self.read)
+
+    def for_receipt(self, deadline: Deadline = None) -> float:
+        """Seconds to wait for a transaction receipt"""
+        return deadline.clamp(self.receipt) if deadline else self.receipt
+
+DEFAULT_TIMEOUTS = Timeouts()
@@ -0,0 +1,86 @@
+import json
+import time
+import base64
+from contextlib import contextmanager
+from key_derivation import get_fernet, EncryptedJsonFile
+
+SALT_FILE = "token_salt.key"
+# Used when a token doesn't carry a readable JWT expiry
+DEFAULT_TOKEN_TTL = 12 * 60 * 60
+# Treat tokens this close to expiry as already expired
+EXPIRY_MARGIN = 5 * 60
+
+def token_expiry(token: str, default_ttl: int = DEFAULT_TOKEN_TTL) -> int:
+    """Return the expiry timestamp of a bearer token
+    Reads the 'exp' claim of a JWT; falls back to now + default_ttl.
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload))['exp']
+        return int(exp)
+    except Exception:
+        return int(time.time()) + default_ttl
+
+class TokenCache:
+    """Encrypted cache of API bearer tokens keyed by wallet address"""
+
+    def __init__(self, storage_password, autosave: bool = True):
+        """Initialize token cache with encryption"""
+        self.storage_file = "tokens_data.enc"
+        self.salt_file = SALT_FILE
+        self.autosave = autosave
+        self._dirty = False
+        self.fernet = get_fernet(storage_password, self.salt_file)
+        self._file = EncryptedJsonFile(self.storage_file, self.fernet)
+
+    def _tokens(self) -> dict:
+        """Return the decrypted tokens, decrypting the file only when it changed
+        Pending changes are made to this dict in place.
+        """
+        if self._dirty:
+            return self._file.data
+        return self._file.load()
+
+    def save(self):
+        """Write pending changes, dropping expired tokens"""
+        if not self._dirty:
+            return
+        now = int(time.time())
+        self._file.save({addr: entry for addr, entry in self._file.data.items() if entry['expires_at'] > now})
+        self._dirty = False
+
+    @contextmanager
+    def batch(self):
+        """Defer writes until the block exits, so a sweep writes the file once"""
+        autosave, self.autosave = self.autosave, False
+        try:
+            yield self
+        finally:
+            self.autosave = autosave
+            self.save()
+
+    def _changed(self):
+        self._dirty = True
+        if self.autosave:
+            self.save()
+
+    def get(self, wallet_address: str) -> str:
+        """Return a still-valid token for the wallet, or None"""
+        entry = self._tokens().get(wallet_address.lower())
+        if not entry or entry['expires_at'] - EXPIRY_MARGIN <= time.time():
+            return None
+        return entry['token']
+
+    def set(self, wallet_address: str, token: str, expires_at: int = None):
+        """Store a token for the wallet"""
+        self._tokens()[wallet_address.lower()] = {
+            'token': token,
+            'expires_at': expires_at or token_expiry(token)
+        }
+        self._changed()
+
+    def invalidate(self, wallet_address: str):
+        """Forget the wallet's token, e.g. after the API rejected it"""
+        if self._tokens().pop(wallet_address.lower(), None) is not None:
+            self._changed()
@@ -1,108 +1,101 @@
-import os
-import json
-import base64
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from web3 import Web3
+from contextlib import contextmanager
+from key_derivation import get_fernet, EncryptedJsonFile
+from accounts import private_key_to_address
+from parallel import map_chunked
+
+SALT_FILE = "wallet_salt.key"
+
+def validate_private_key(private_key: str) -> tuple:
+    """Validate private key and return (private_key, address)"""
+    try:
+        # Remove '0x' prefix if present
+        clean_key = private_key.strip().replace('0x', '')
+        
+        # Validate key length
+        if len(clean_key) != 64:
+            raise ValueError("Invalid private key length")
+            
+        # Validate hex format
+        int(clean_key, 16)
+        
+        # Get address from private key
+        return clean_key, private_key_to_address(clean_key)
+        
+    except ValueError as e:
+        raise ValueError(f"Invalid private key format: {str(e)}")
+    except Exception as e:
+        raise ValueError(f"Error validating private key: {str(e)}")
+
+def _validate_key_chunk(private_keys: list) -> list:
+    """Validate a chunk of keys, returning (private_key, address, error) for each"""
+    results = []
+    for private_key in private_keys:
+        try:
+            clean_key, address = validate_private_key(private_key)
+            results.append((clean_key, address, None))
+        except ValueError as e:
+            results.append((None, None, str(e)))
+    return results
+
+def validate_private_keys(private_keys: list) -> list:
+    """Validate many keys in a process pool
+    Returns (private_key, address, error) for each key, in input order;
+    error is None for valid keys.
+    """
+    return map_chunked(_validate_key_chunk, private_keys)
 
 class WalletStorage:
     def __init__(self, storage_password):
         """Initialize wallet storage with encryption"""
         self.storage_file = "wallets_data.enc"
-        self.salt_file = "wallet_salt.key"
+        self.salt_file = SALT_FILE
         self._init_encryption(storage_password)
-        self.web3 = Web3(Web3.HTTPProvider("https://rpc-mainnet.taker.xyz/"))
         
     def _init_encryption(self, password):
         """Initialize encryption with password"""
-        if os.path.exists(self.salt_file):
-            with open(self.salt_file, "rb") as f:
-                salt = f.read()
-        else:
-            salt = os.urandom(16)
-            with open(self.salt_file, "wb") as f:
-                f.write(salt)
+        self.fernet = get_fernet(password, self.salt_file)
+        self._file = EncryptedJsonFile(self.storage_file, self.fernet)
 
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=480000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-        self.fernet = Fernet(key)
+    def _cached_wallets(self):
+        """Return the decrypted wallets, decrypting the file only when it changed
+        The returned dict is shared with the cache and must not be modified.
+        """
+        return self._file.load()
 
     def _load_wallets(self):
         """Load all stored wallets"""
-        if not os.path.exists(self.storage_file):
-            return {}
-            
-        with open(self.storage_file, "rb") as f:
-            encrypted_data = f.read()
-        
-        try:
-            decrypted_data = json.loads(self.fernet.decrypt(encrypted_data))
-            return decrypted_data
-        except:
-            return {}
+        # Callers modify the result before saving, so hand out a copy
+        return dict(self._cached_wallets())
 
     def _save_wallets(self, wallets_data):
         """Save all wallets data"""
-        encrypted_data = self.fernet.encrypt(json.dumps(wallets_data).encode())
-        with open(self.storage_file, "wb") as f:
-            f.write(encrypted_data)
+        self._file.save(dict(wallets_data))
 
     def _get_next_wallet_number(self):
         """Get next available wallet number"""
-        wallets = self._load_wallets()
+        wallets = self._cached_wallets()
         existing_numbers = [int(name.split('_')[1]) for name in wallets.keys() if name.startswith('Wallet_')]
         return max(existing_numbers, default=0) + 1
 
     def _validate_private_key(self, private_key: str) -> tuple:
         """Validate private key and return (private_key, address)"""
-        try:
-            # Remove '0x' prefix if present
-            clean_key = private_key.strip().replace('0x', '')
-            
-            # Validate key length
-            if len(clean_key) != 64:
-                raise ValueError("Invalid private key length")
-                
-            # Validate hex format
-            int(clean_key, 16)
-            
-            # Get address from private key
-            account = self.web3.eth.account.from_key(clean_key)
-            return clean_key, account.address
-            
-        except ValueError as e:
-            raise ValueError(f"Invalid private key format: {str(e)}")
-        except Exception as e:
-            raise ValueError(f"Error validating private key: {str(e)}")
+        return validate_private_key(private_key)
+
+    @contextmanager
+    def transaction(self):
+        """Group several changes into one load and one write
+        Yields a WalletBatch; its changes are saved when the block exits
+        normally and discarded if it raises.
+        """
+        batch = WalletBatch(self)
+        yield batch
+        if batch.changed:
+            self._save_wallets(batch.wallets)
 
     def add_wallet(self, private_key: str) -> str:
         """Add a single wallet and return its name"""
-        clean_key, address = self._validate_private_key(private_key)
-        
-        wallets = self._load_wallets()
-        
-        # Check if wallet already exists
-        for name, data in wallets.items():
-            if data['address'].lower() == address.lower():
-                raise ValueError(f"Wallet already exists as {name}")
-        
-        wallet_number = self._get_next_wallet_number()
-        wallet_name = f"Wallet_{wallet_number}"
-        
-        wallets[wallet_name] = {
-            'private_key': clean_key,
-            'address': address
-        }
-        
-        self._save_wallets(wallets)
-        print(f"Added {wallet_name}: {address}")
-        return wallet_name
+        with self.transaction() as batch:
+            return batch.add_wallet(private_key)
 
     def bulk_add_wallets(self, private_keys: str) -> tuple:
         """Add multiple wallets from comma-separated private keys
@@ -115,19 +108,25 @@ class WalletStorage:
         # Split and clean private keys
         keys = [key.strip() for key in private_keys.split(',') if key.strip()]
         
-        for key in keys:
-            try:
-                self.add_wallet(key)
-                success_count += 1
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"Failed to add wallet with key ending in ...{key[-8:]}: {str(e)}")
+        # Derive addresses across all cores, then load once, check
+        # duplicates against an address set and write once
+        validated = validate_private_keys(keys)
+        with self.transaction() as batch:
+            for key, (clean_key, address, error) in zip(keys, validated):
+                try:
+                    if error:
+                        raise ValueError(error)
+                    batch.add_validated(clean_key, address)
+                    success_count += 1
+                except Exception as e:
+                    failed_count += 1
+                    errors.append(f"Failed to add wallet with key ending in ...{key[-8:]}: {str(e)}")
         
         return success_count, failed_count, errors
 
     def get_wallet(self, wallet_name: str) -> tuple:
         """Get wallet private key and address"""
-        wallets = self._load_wallets()
+        wallets = self._cached_wallets()
         if wallet_name not in wallets:
             raise ValueError(f"Wallet {wallet_name} not found")
             
@@ -210,7 +209,7 @@ class WalletStorage:
 
     def list_wallets(self) -> list:
         """List all stored wallets"""
-        wallets = self._load_wallets()
+        wallets = self._cached_wallets()
         
         # Sort wallets by number
         sorted_wallets = []
@@ -226,6 +225,42 @@ class WalletStorage:
         sorted_wallets.sort()  # Sort by number
         return [(name, addr) for _, name, addr in sorted_wallets]
 
+class WalletBatch:
+    """Pending changes to a WalletStorage, written once by WalletStorage.transaction()"""
+
+    def __init__(self, storage: WalletStorage):
+        """Load wallets once and index them for duplicate checks"""
+        self.storage = storage
+        self.wallets = storage._load_wallets()
+        self.changed = False
+        self._addresses = {data['address'].lower(): name for name, data in self.wallets.items()}
+        existing_numbers = [int(name.split('_')[1]) for name in self.wallets.keys() if name.startswith('Wallet_')]
+        self._next_number = max(existing_numbers, default=0) + 1
+
+    def add_wallet(self, private_key: str) -> str:
+        """Validate and add a single wallet, returning its name"""
+        clean_key, address = self.storage._validate_private_key(private_key)
+        return self.add_validated(clean_key, address)
+
+    def add_validated(self, clean_key: str, address: str) -> str:
+        """Add a wallet whose key was already validated, returning its name"""
+        # Check if wallet already exists
+        existing = self._addresses.get(address.lower())
+        if existing:
+            raise ValueError(f"Wallet already exists as {existing}")
+        
+        wallet_name = f"Wallet_{self._next_number}"
+        self._next_number += 1
+        
+        self.wallets[wallet_name] = {
+            'private_key': clean_key,
+            'address': address
+        }
+        self._addresses[address.lower()] = wallet_name
+        self.changed = True
+        print(f"Added {wallet_name}: {address}")
+        return wallet_name
+
 def setup_new_wallet():
     """Interactive function to set up new wallet storage"""
     print("\n=== Wallet Storage Setup ===")
@@ -233,6 +268,7 @@ def setup_new_wallet():
     
     storage = WalletStorage(storage_password)
     
+    # Save each wallet as it is entered, so an interrupted setup keeps the ones already added
     while True:
         print("\nEnter wallet details (or press Enter to finish):")
         private_key = input("Private Key: ").strip()